@@ -25,7 +25,7 @@ sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "src"))
 
 from src.config.settings import load_config_from_file
-from src.core.application import ShadowWallApplication
+from src.core.application import ShadowWallApplication, install_event_loop_policy
 from src.utils.logger import setup_logging, get_logger
 
 # Alias for backward compatibility
@@ -478,4 +478,5 @@ async def main():
         logger.info("✅ ShadowWall AI stopped successfully")
 
 if __name__ == "__main__":
+    install_event_loop_policy()
     asyncio.run(main())
@@ -23,7 +23,7 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "src"))
 
-from src.core.application import ShadowWallApplication
+from src.core.application import ShadowWallApplication, install_event_loop_policy
 from src.utils.logger import setup_logging, get_logger
 from src.config.settings import load_config_from_file as load_config
 
@@ -111,4 +111,5 @@ async def main():
         logger.info("✅ ShadowWall AI stopped successfully")
 
 if __name__ == "__main__":
+    install_event_loop_policy()
     asyncio.run(main())
@@ -10,7 +10,7 @@ import sys
 import yaml
 from pathlib import Path
 
-from src.core.application import ShadowWallApplication
+from src.core.application import ShadowWallApplication, install_event_loop_policy
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -75,6 +75,7 @@ async def main():
         print("🛑 ShadowWall AI System Stopped")
 
 if __name__ == "__main__":
+    install_event_loop_policy()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -50,8 +50,14 @@ class ShadowWallSettings(BaseSettings):
     # Database
     database_url: str = "sqlite:///data/shadowwall.db"
     database_echo: bool = False
-    database_pool_size: int = 10
-    database_max_overflow: int = 20
+    database_pool_size: int = 20
+    database_max_overflow: int = 40
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+    database_prewarm: bool = True
+    database_retention_days: int = 30
+    database_write_batch_size: int = 500
+    database_write_flush_interval: float = 0.1
     
     # Redis
     redis_host: str = "localhost"
@@ -205,7 +211,13 @@ def get_settings() -> Dict[str, Any]:
             'url': settings.database_url,
             'echo': settings.database_echo,
             'pool_size': settings.database_pool_size,
-            'max_overflow': settings.database_max_overflow
+            'max_overflow': settings.database_max_overflow,
+            'pool_recycle': settings.database_pool_recycle,
+            'pool_pre_ping': settings.database_pool_pre_ping,
+            'prewarm': settings.database_prewarm,
+            'retention_days': settings.database_retention_days,
+            'write_batch_size': settings.database_write_batch_size,
+            'write_flush_interval': settings.database_write_flush_interval
         },
         'redis': {
             'host': settings.redis_host,
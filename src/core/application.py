@@ -21,6 +21,16 @@ from ..database.connection import DatabaseManager
 
 logger = get_logger(__name__)
 
+def install_event_loop_policy() -> bool:
+    """Run asyncio on uvloop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
 class ShadowWallApplication:
     """Main ShadowWall AI application class"""
     
@@ -30,7 +40,19 @@ class ShadowWallApplication:
         self.components = {}
         
         # Initialize database
-        self.db_manager = DatabaseManager(config['database']['url'])
+        db_config = config['database']
+        self.db_manager = DatabaseManager(
+            db_config['url'],
+            echo=db_config.get('echo', False),
+            pool_size=db_config.get('pool_size', 20),
+            max_overflow=db_config.get('max_overflow', 40),
+            pool_recycle=db_config.get('pool_recycle', 1800),
+            pool_pre_ping=db_config.get('pool_pre_ping', True),
+            prewarm=db_config.get('prewarm', True),
+            retention_days=db_config.get('retention_days', 30),
+            write_batch_size=db_config.get('write_batch_size', 500),
+            write_flush_interval=db_config.get('write_flush_interval', 0.1)
+        )
         
         # Initialize core components
         self._initialize_components()
@@ -281,13 +303,14 @@ class ShadowWallApplication:
             "data": interaction_data
         })
     
-    async def _process_network_packet(self, packet_data):
-        """Process captured network packets"""
-        # Feed to behavioral analyzer
-        await self.behavioral_analyzer.process_packet(packet_data)
-        
-        # Check against threat indicators
-        await self.threat_detector.analyze_packet(packet_data)
+    async def _process_network_packet(self, packets):
+        """Process a batch of captured network packets"""
+        for packet_data in packets:
+            # Feed to behavioral analyzer
+            await self.behavioral_analyzer.process_packet(packet_data)
+            
+            # Check against threat indicators
+            await self.threat_detector.analyze_packet(packet_data)
     
     async def _process_connection_event(self, connection_data):
         """Process network connection events"""
@@ -7,6 +7,7 @@ import asyncio
 import logging
 import random
 import socket
+from collections import deque
 from typing import Dict, Any, List, Callable, Optional
 from dataclasses import dataclass
 from datetime import datetime
@@ -375,8 +376,9 @@ class FTPHoneypot(ServiceEmulator):
 class HoneypotManager:
     """Manager for dynamic honeypot deployment and management"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], clock: Callable[[], datetime] = datetime.utcnow):
         self.config = config
+        self._clock = clock
         self.honeypots: Dict[str, HoneypotInstance] = {}
         self.service_emulators: Dict[str, ServiceEmulator] = {}
         self.running = False
@@ -402,6 +404,9 @@ class HoneypotManager:
         # Event callbacks
         self._interaction_callbacks: List[Callable] = []
         
+        # Recent interactions across all honeypots, oldest dropped first
+        self.interactions: deque = deque(maxlen=config.get('interaction_history', 10000))
+        
         # Statistics
         self.stats = {
             'honeypots_deployed': 0,
@@ -462,7 +467,7 @@ class HoneypotManager:
                 return None
             
             # Generate unique instance ID
-            instance_id = f"{service_type}_{port}_{int(datetime.utcnow().timestamp())}"
+            instance_id = f"{service_type}_{port}_{int(self._clock().timestamp())}"
             
             # Create service emulator
             if service_type in self.available_services:
@@ -487,7 +492,7 @@ class HoneypotManager:
                     status="running",
                     interactions=0,
                     last_interaction=None,
-                    created_at=datetime.utcnow(),
+                    created_at=self._clock(),
                     config=custom_config or {}
                 )
                 
@@ -665,8 +670,7 @@ class HoneypotManager:
                 for instance_id, emulator in self.service_emulators.items():
                     if emulator.interactions:
                         # Process new interactions
-                        for interaction in emulator.interactions:
-                            await self._process_interaction(interaction)
+                        await self.record_interactions([i.__dict__ for i in emulator.interactions])
                         
                         # Update honeypot statistics
                         honeypot = self.honeypots[instance_id]
@@ -685,20 +689,21 @@ class HoneypotManager:
                 logger.error(f"Error collecting interactions: {e}")
                 await asyncio.sleep(10)
     
-    async def _process_interaction(self, interaction: HoneypotInteraction):
-        """Process a honeypot interaction"""
-        try:
-            logger.info(f"Honeypot interaction: {interaction.service} from {interaction.source_ip}")
-            
-            # Notify callbacks
+    async def record_interactions(self, interactions: List[Dict[str, Any]]):
+        """Record a batch of interactions and notify callbacks, logging once per batch"""
+        if not interactions:
+            return
+        
+        self.interactions.extend(interactions)
+        logger.info(f"Recorded {len(interactions)} honeypot interactions")
+        
+        # Notify callbacks
+        for interaction in interactions:
             for callback in self._interaction_callbacks:
                 try:
-                    await callback(interaction.__dict__)
+                    await callback(interaction)
                 except Exception as e:
                     logger.error(f"Error in interaction callback: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error processing interaction: {e}")
     
     # Simple implementations for other service emulators
     async def _create_telnet_emulator(self, port: int, config: Dict[str, Any]):
@@ -724,7 +729,7 @@ class HoneypotManager:
                     'status': h.status,
                     'interactions': h.interactions,
                     'last_interaction': h.last_interaction.isoformat() if h.last_interaction else None,
-                    'uptime': (datetime.utcnow() - h.created_at).total_seconds()
+                    'uptime': (self._clock() - h.created_at).total_seconds()
                 }
                 for instance_id, h in self.honeypots.items()
             },
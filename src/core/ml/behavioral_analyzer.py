@@ -36,6 +36,9 @@ class BehavioralAnomaly:
 @dataclass
 class EntityProfile:
     """Profile for a network entity (IP, user, etc.)"""
+    __slots__ = ('entity_id', 'entity_type', 'first_seen', 'last_seen',
+                 'activity_patterns', 'baseline_features', 'anomaly_history')
+    
     entity_id: str
     entity_type: str
     first_seen: datetime
@@ -47,8 +50,9 @@ class EntityProfile:
 class BehavioralAnalyzer:
     """Advanced behavioral analysis using machine learning"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], clock: Callable[[], datetime] = datetime.utcnow):
         self.config = config
+        self._clock = clock
         self.window_size = config['window_size']
         self.anomaly_threshold = config['anomaly_threshold']
         
@@ -167,7 +171,7 @@ class BehavioralAnalyzer:
     
     async def _update_entity_profile(self, entity_id: str, entity_type: str, data):
         """Update or create entity profile"""
-        current_time = datetime.utcnow()
+        current_time = self._clock()
         
         if entity_id not in self.entity_profiles:
             # Create new profile
@@ -203,7 +207,7 @@ class BehavioralAnalyzer:
                 return None
             
             # Time-based features
-            current_time = datetime.utcnow()
+            current_time = self._clock()
             time_since_last = (current_time - recent_activity[-2]['timestamp']).total_seconds()
             features['time_since_last_packet'] = time_since_last
             
@@ -313,7 +317,7 @@ class BehavioralAnalyzer:
             if attacker_ip in self.entity_profiles:
                 profile = self.entity_profiles[attacker_ip]
                 features['previous_interactions'] = len(profile.anomaly_history)
-                features['time_since_first_seen'] = (datetime.utcnow() - profile.first_seen).total_seconds()
+                features['time_since_first_seen'] = (self._clock() - profile.first_seen).total_seconds()
             
             return features
             
@@ -397,7 +401,7 @@ class BehavioralAnalyzer:
             
             # Create anomaly object
             anomaly = BehavioralAnomaly(
-                timestamp=datetime.utcnow(),
+                timestamp=self._clock(),
                 entity_id=entity_id,
                 entity_type=entity_type,
                 anomaly_type=anomaly_type,
@@ -510,7 +514,7 @@ class BehavioralAnalyzer:
             try:
                 await asyncio.sleep(3600)  # Cleanup every hour
                 
-                current_time = datetime.utcnow()
+                current_time = self._clock()
                 cutoff_time = current_time - timedelta(days=7)
                 
                 # Clean up old entity profiles
@@ -4,26 +4,399 @@ Uses ensemble models to predict and detect cyber threats
 """
 
 import asyncio
+import bisect
 import logging
 import pickle
+from collections import OrderedDict
 import numpy as np
-import pandas as pd
-from typing import Dict, Any, List, Callable, Optional
+from typing import Dict, Any, List, Callable, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
+from types import MappingProxyType
 
-from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
 
+try:
+    from numba import njit
+except ImportError:
+    # Fallback for environments without numba: run the kernels as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    # Compiled forests are optional; PackedForest is used without them
+    treelite = None
+    tl2cgen = None
+
 from ...utils.logger import get_logger
 from ...utils.feature_extraction import NetworkFeatureExtractor
 
 logger = get_logger(__name__)
 
+# Positional names of the leading feature columns used by threat patterns
+# (this would need proper mapping based on the feature extractor)
+PATTERN_FEATURE_NAMES = (
+    'connection_rate', 'packet_rate', 'bandwidth_usage',
+    'unique_ports', 'failed_connections', 'outbound_traffic',
+    'unusual_hours', 'data_volume', 'internal_connections',
+    'privilege_escalation', 'system_discovery', 'network_scanning',
+    'service_enumeration', 'vulnerability_probing', 'source_diversity'
+)
+
+# Persisted model files; random forests are stored as packed tree arrays
+MODEL_FILES = {
+    'anomaly_detector': 'hs_trees.npz',
+    'threat_classifier': 'random_forest.npz',
+    'behavioral_model': 'behavioral_classifier.npz'
+}
+
+# Recommended actions per threat type, shared across detections
+_ACTIONS_MAP = MappingProxyType({
+    'port_scan': ('block_source_ip', 'increase_monitoring', 'deploy_honeypot'),
+    'dos': ('rate_limit', 'block_source_ip', 'scale_resources'),
+    'ddos': ('activate_ddos_protection', 'contact_isp', 'emergency_response'),
+    'malware': ('isolate_system', 'run_antivirus', 'forensic_analysis'),
+    'phishing': ('block_domain', 'user_education', 'email_filtering'),
+    'data_exfiltration': ('block_connection', 'investigate_user', 'audit_access'),
+    'lateral_movement': ('isolate_network_segment', 'reset_credentials', 'incident_response'),
+    'reconnaissance': ('deploy_deception', 'increase_logging', 'monitor_closely')
+})
+_DEFAULT_ACTIONS = ('investigate', 'monitor', 'alert_admin')
+
+# Confidence edges between consecutive risk levels
+_RISK_EDGES = (0.5, 0.7, 0.9)
+_RISK_LABELS = ('low', 'medium', 'high', 'critical')
+
+@njit(cache=True)
+def _score_patterns(features, thr, mask, out):
+    """Write the number of exceeded thresholds for each pattern to out"""
+    n_features = min(features.shape[0], thr.shape[1])
+    for p in range(thr.shape[0]):
+        score = 0.0
+        for j in range(n_features):
+            if mask[p, j] and features[j] >= thr[p, j]:
+                score += 1.0
+        out[p] = score
+
+@njit(cache=True)
+def _hs_update(X, feature, split, mass, depth):
+    """Add each row of X to the node masses along its path in every tree"""
+    for i in range(X.shape[0]):
+        for t in range(feature.shape[0]):
+            node = 0
+            for level in range(depth + 1):
+                mass[t, node] += 1.0
+                if level == depth:
+                    break
+                if X[i, feature[t, node]] < split[t, node]:
+                    node = 2 * node + 1
+                else:
+                    node = 2 * node + 2
+
+@njit(cache=True)
+def _hs_score(X, feature, split, mass, depth, size_limit, n_seen, out):
+    """Write the mean mass-times-volume score of each row of X to out"""
+    n_trees = feature.shape[0]
+    for i in range(X.shape[0]):
+        total = 0.0
+        for t in range(n_trees):
+            node = 0
+            for level in range(depth + 1):
+                fraction = mass[t, node] / n_seen
+                if fraction <= size_limit or level == depth:
+                    total += fraction * 2.0 ** level
+                    break
+                if X[i, feature[t, node]] < split[t, node]:
+                    node = 2 * node + 1
+                else:
+                    node = 2 * node + 2
+        out[i] = total / n_trees
+
+# Synthetic training classes per model: (label, probability, first and last shifted column, shift mean, shift std)
+_SYNTHETIC_CLASSES = MappingProxyType({
+    'anomaly_detector': (
+        ('normal', 0.9, 0, 0, 0.0, 0.0),
+        ('anomaly', 0.1, 0, 32, 5.0, 2.0),
+    ),
+    'threat_classifier': (
+        ('normal', 0.2, 0, 0, 0.0, 0.0),
+        ('port_scan', 0.2, 0, 5, 3.0, 0.0),  # High connection rates
+        ('dos', 0.2, 5, 10, 4.0, 0.0),  # High traffic volume
+        ('malware', 0.2, 10, 15, 2.0, 0.0),  # Unusual network patterns
+        ('phishing', 0.2, 15, 20, 1.5, 0.0),  # Suspicious DNS queries
+    ),
+    'behavioral_model': (
+        ('normal', 0.8, 0, 0, 0.0, 0.0),
+        ('suspicious', 0.15, 0, 10, 1.5, 0.0),
+        ('malicious', 0.05, 0, 10, 3.0, 0.0),
+    ),
+})
+
+def _synthetic_training(n_samples: int, n_features: int, seed: int, classes: Sequence[tuple]):
+    """Generate float32 synthetic features and string labels for the given class specs"""
+    names, probs, start, stop, mean, std = zip(*classes)
+    rng = np.random.default_rng(seed)
+    
+    # Drawn as float32 so the matrix never goes through a float64 copy
+    features = rng.standard_normal((n_samples, n_features), dtype=np.float32)
+    labels = rng.choice(len(names), n_samples, p=probs)
+    
+    for k in range(len(names)):
+        if stop[k] > start[k]:
+            rows = np.flatnonzero(labels == k)
+            shift = rng.normal(mean[k], std[k], (rows.size, stop[k] - start[k]))
+            features[rows, start[k]:stop[k]] += shift.astype(np.float32)
+    
+    return features, np.array(names)[labels]
+
+class HSTrees:
+    """Streaming half-space trees anomaly detector"""
+    
+    def __init__(self, n_trees: int = 25, depth: int = 10, size_limit: float = 0.1,
+                 contamination: float = 0.1, random_state: Optional[int] = None):
+        self.n_trees = n_trees
+        self.depth = depth
+        self.size_limit = size_limit
+        self.contamination = contamination
+        self.random_state = random_state
+        
+        self.feature: Optional[np.ndarray] = None
+        self.split: Optional[np.ndarray] = None
+        self.mass: Optional[np.ndarray] = None
+        self.n_seen = 0.0
+        self.offset_ = 0.0
+        self.scale_ = 1.0
+    
+    def _build(self, X: np.ndarray):
+        """Draw random half-space splits from perturbed feature ranges"""
+        rng = np.random.RandomState(self.random_state)
+        n_internal = 2 ** self.depth - 1
+        n_features = X.shape[1]
+        x_min = X.min(axis=0)
+        x_max = X.max(axis=0)
+        
+        self.feature = np.empty((self.n_trees, n_internal), dtype=np.int32)
+        self.split = np.empty((self.n_trees, n_internal), dtype=np.float32)
+        self.mass = np.zeros((self.n_trees, 2 * n_internal + 1), dtype=np.float64)
+        self.n_seen = 0.0
+        
+        for t in range(self.n_trees):
+            pivot = rng.uniform(x_min, x_max)
+            span = 2.0 * np.maximum(pivot - x_min, x_max - pivot)
+            lo = np.empty((n_internal, n_features))
+            hi = np.empty((n_internal, n_features))
+            lo[0] = pivot - span
+            hi[0] = pivot + span
+            
+            for node in range(n_internal):
+                q = rng.randint(n_features)
+                mid = (lo[node, q] + hi[node, q]) / 2.0
+                self.feature[t, node] = q
+                self.split[t, node] = mid
+                
+                for child, is_left in ((2 * node + 1, True), (2 * node + 2, False)):
+                    if child < n_internal:
+                        lo[child] = lo[node]
+                        hi[child] = hi[node]
+                        if is_left:
+                            hi[child, q] = mid
+                        else:
+                            lo[child, q] = mid
+    
+    def fit(self, X: np.ndarray) -> 'HSTrees':
+        """Build the trees, record masses and calibrate the decision offset"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self._build(X)
+        self.partial_fit(X)
+        
+        # The contamination quantile maps to 0 and the lowest training score to -0.5, so
+        # the detector's -0.5 trigger fires only on rows less typical than any seen in
+        # training, as it did with IsolationForest
+        scores = self.score_samples(X)
+        self.offset_ = float(np.percentile(scores, 100.0 * self.contamination))
+        self.scale_ = max(2.0 * (self.offset_ - float(scores.min())), 1e-12)
+        return self
+    
+    def partial_fit(self, X: np.ndarray) -> 'HSTrees':
+        """Update node masses with new observations"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        _hs_update(X, self.feature, self.split, self.mass, self.depth)
+        self.n_seen += X.shape[0]
+        return self
+    
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """Log mass score of each row; lower is more anomalous"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        out = np.empty(X.shape[0], dtype=np.float64)
+        _hs_score(X, self.feature, self.split, self.mass, self.depth,
+                  self.size_limit, max(self.n_seen, 1.0), out)
+        return np.log2(out + 1e-12)
+    
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Score in [-1, 1]; negative values are anomalies"""
+        return np.clip((self.score_samples(X) - self.offset_) / self.scale_, -1.0, 1.0)
+    
+    def save(self, path: Path):
+        """Save the trees and masses as a single .npz archive"""
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                feature=self.feature,
+                split=self.split,
+                mass=self.mass,
+                params=np.array([self.depth, self.size_limit, self.contamination,
+                                 self.n_seen, self.offset_, self.scale_])
+            )
+    
+    @classmethod
+    def load(cls, path: Path) -> 'HSTrees':
+        """Load a detector saved by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            depth, size_limit, contamination, n_seen, offset, scale = data['params']
+            model = cls(n_trees=data['feature'].shape[0], depth=int(depth),
+                        size_limit=float(size_limit), contamination=float(contamination))
+            model.feature = data['feature']
+            model.split = data['split']
+            model.mass = data['mass']
+        
+        model.n_seen = float(n_seen)
+        model.offset_ = float(offset)
+        model.scale_ = float(scale)
+        return model
+
+class PackedForest:
+    """Random forest classifier flattened into contiguous node arrays"""
+    
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray,
+                 children_left: np.ndarray, children_right: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, classes: np.ndarray,
+                 max_depth: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+    
+    @classmethod
+    def from_sklearn(cls, forest: RandomForestClassifier) -> 'PackedForest':
+        """Pack the trees of a fitted sklearn random forest"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int32) + offset
+            is_leaf = tree.children_left == -1
+            
+            # Leaves point at themselves so traversal runs a fixed number of steps
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32))
+            
+            node_values = tree.value[:, 0, :]
+            totals = node_values.sum(axis=1, keepdims=True)
+            values.append((node_values / np.where(totals > 0, totals, 1.0)).astype(np.float32))
+            
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children_left=np.concatenate(lefts),
+            children_right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            classes=np.asarray(forest.classes_).astype(str),
+            max_depth=max_depth
+        )
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Average leaf class probabilities over all trees"""
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        
+        return self.value[nodes].mean(axis=1)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict the most probable class"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+    
+    def save(self, path: Path):
+        """Save the packed arrays as a single .npz archive"""
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                feature=self.feature,
+                threshold=self.threshold,
+                children_left=self.children_left,
+                children_right=self.children_right,
+                value=self.value,
+                roots=self.roots,
+                classes=self.classes_,
+                max_depth=np.array(self.max_depth)
+            )
+    
+    @classmethod
+    def load(cls, path: Path) -> 'PackedForest':
+        """Load packed arrays saved by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                feature=data['feature'],
+                threshold=data['threshold'],
+                children_left=data['children_left'],
+                children_right=data['children_right'],
+                value=data['value'],
+                roots=data['roots'],
+                classes=data['classes'],
+                max_depth=int(data['max_depth'])
+            )
+
+class CompiledForest:
+    """Random forest compiled to a native shared library with treelite"""
+    
+    def __init__(self, libpath: Path, classes: np.ndarray):
+        self.libpath = Path(libpath)
+        self.predictor = tl2cgen.Predictor(str(self.libpath))
+        self.classes_ = classes
+    
+    @classmethod
+    def compile(cls, forest: RandomForestClassifier, libpath: Path) -> 'CompiledForest':
+        """Generate, build and load a shared library for a fitted forest"""
+        model = treelite.sklearn.import_model(forest)
+        tl2cgen.export_lib(model, toolchain='gcc', libpath=str(libpath), params={'parallel_comp': 32})
+        return cls(libpath, np.asarray(forest.classes_).astype(str))
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Average leaf class probabilities over all trees"""
+        X = np.asarray(X, dtype=np.float32)
+        return self.predictor.predict(tl2cgen.DMatrix(X)).reshape(X.shape[0], -1)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict the most probable class"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
 @dataclass
 class ThreatPrediction:
     """Threat prediction result"""
@@ -34,7 +407,7 @@ class ThreatPrediction:
     target_ip: str
     indicators: Dict[str, Any]
     risk_level: str
-    recommended_actions: List[str]
+    recommended_actions: Sequence[str]
 
 @dataclass
 class ThreatPattern:
@@ -52,10 +425,16 @@ class ThreatDetector:
         self.config = config
         self.models = {}
         self.scalers = {}
+        
+        # Precomputed standardization parameters per model
+        self._mean: Dict[str, np.ndarray] = {}
+        self._inv_std: Dict[str, np.ndarray] = {}
+        self._scalers_share = False
         self.feature_extractor = NetworkFeatureExtractor()
         
         # Threat patterns database
         self.threat_patterns = self._load_threat_patterns()
+        self._compile_threat_patterns()
         
         # Event callbacks
         self._threat_callbacks: List[Callable] = []
@@ -68,9 +447,25 @@ class ThreatDetector:
             'accuracy': 0.0
         }
         
-        # Feature buffer for real-time analysis
-        self.feature_buffer = []
+        # Feature ring buffer for real-time analysis (structure of arrays with
+        # IPv4 addresses as integers; the feature matrix is allocated on first
+        # write once the width is known)
         self.buffer_size = 1000
+        self._buf_feat: Optional[np.ndarray] = None
+        self._buf_ts = np.empty(self.buffer_size, dtype='datetime64[ns]')
+        self._buf_src = np.empty(self.buffer_size, dtype=np.uint32)
+        self._buf_dst = np.empty(self.buffer_size, dtype=np.uint32)
+        self._buf_idx = 0
+        
+        # Reusable single-row input for model inference
+        self._scratch = np.empty((1, 32), dtype=np.float32)
+        
+        # LRU cache of model outputs keyed on quantized feature vectors
+        self._prediction_cache: Dict[str, OrderedDict] = {
+            'anomaly_detector': OrderedDict(),
+            'threat_classifier': OrderedDict()
+        }
+        self.prediction_cache_size = 4096
     
     async def initialize(self):
         """Initialize ML models and load pre-trained weights"""
@@ -90,46 +485,79 @@ class ThreatDetector:
     
     async def _load_or_create_models(self):
         """Load existing models or create new ones"""
-        model_files = {
-            'anomaly_detector': 'isolation_forest.pkl',
-            'threat_classifier': 'random_forest.pkl',
-            'behavioral_model': 'behavioral_classifier.pkl'
-        }
-        
-        for model_name, filename in model_files.items():
+        for model_name, filename in MODEL_FILES.items():
             model_file = self.model_path / filename
             scaler_file = self.model_path / f"{model_name}_scaler.pkl"
             
             if model_file.exists() and scaler_file.exists():
                 # Load existing model
                 logger.info(f"Loading {model_name} from {model_file}")
-                self.models[model_name] = joblib.load(model_file)
+                if model_name == 'anomaly_detector':
+                    self.models[model_name] = HSTrees.load(model_file)
+                elif model_file.suffix == '.npz':
+                    packed = PackedForest.load(model_file)
+                    compiled = self._load_compiled_forest(model_file.with_suffix('.so'), packed.classes_)
+                    self.models[model_name] = compiled or packed
+                else:
+                    self.models[model_name] = joblib.load(model_file)
                 self.scalers[model_name] = joblib.load(scaler_file)
             else:
                 # Create new model
                 logger.info(f"Creating new {model_name}")
                 await self._create_model(model_name)
+            
+            self._cache_scaler_params(model_name)
+        
+        self._scalers_share = self._scalers_identical('anomaly_detector', 'threat_classifier')
+    
+    def _scalers_identical(self, first: str, second: str) -> bool:
+        """Check whether two models standardize features identically"""
+        if first not in self.scalers or second not in self.scalers:
+            return False
+        
+        return (np.array_equal(self.scalers[first].mean_, self.scalers[second].mean_) and
+                np.array_equal(self.scalers[first].scale_, self.scalers[second].scale_))
+    
+    def _cache_scaler_params(self, model_name: str):
+        """Cache float32 mean and inverse scale of a model's fitted scaler"""
+        scaler = self.scalers[model_name]
+        self._mean[model_name] = scaler.mean_.astype(np.float32)
+        self._inv_std[model_name] = (1.0 / scaler.scale_).astype(np.float32)
+        
+        # Cached outputs belong to the previous model
+        if model_name in self._prediction_cache:
+            self._prediction_cache[model_name].clear()
+    
+    def _standardize(self, features: np.ndarray, model_name: str) -> np.ndarray:
+        """Standardize features into the reusable inference row"""
+        row = self._scratch[0]
+        np.subtract(features, self._mean[model_name], out=row, casting='same_kind')
+        np.multiply(row, self._inv_std[model_name], out=row)
+        return self._scratch
     
     async def _create_model(self, model_name: str):
         """Create a new ML model"""
         if model_name == 'anomaly_detector':
-            model = IsolationForest(
+            model = HSTrees(
+                n_trees=25,
+                depth=10,
                 contamination=0.1,
-                random_state=42,
-                n_estimators=100
+                random_state=42
             )
         elif model_name == 'threat_classifier':
             model = RandomForestClassifier(
                 n_estimators=200,
                 random_state=42,
                 max_depth=10,
-                min_samples_split=5
+                min_samples_split=5,
+                n_jobs=-1
             )
         elif model_name == 'behavioral_model':
             model = RandomForestClassifier(
                 n_estimators=150,
                 random_state=42,
-                max_depth=8
+                max_depth=8,
+                n_jobs=-1
             )
         else:
             raise ValueError(f"Unknown model type: {model_name}")
@@ -140,16 +568,49 @@ class ThreatDetector:
         # Train with synthetic data if no real data available
         await self._train_with_synthetic_data(model, scaler, model_name)
         
-        self.models[model_name] = model
+        model_file = self.model_path / MODEL_FILES[model_name]
+        scaler_file = self.model_path / f"{model_name}_scaler.pkl"
+        
+        # Random forests are served from packed tree arrays, or from a
+        # compiled shared library when treelite is available
+        compiled = None
+        if isinstance(model, RandomForestClassifier):
+            compiled = self._compile_forest(model, model_file.with_suffix('.so'))
+            model = PackedForest.from_sklearn(model)
+        
+        self.models[model_name] = compiled or model
         self.scalers[model_name] = scaler
         
         # Save model
-        model_file = self.model_path / f"{model_name.replace('_', '_')}.pkl"
-        scaler_file = self.model_path / f"{model_name}_scaler.pkl"
-        
-        joblib.dump(model, model_file)
+        if isinstance(model, (PackedForest, HSTrees)):
+            model.save(model_file)
+        else:
+            joblib.dump(model, model_file)
         joblib.dump(scaler, scaler_file)
     
+    def _compile_forest(self, forest: RandomForestClassifier, libpath: Path) -> Optional[CompiledForest]:
+        """Compile a fitted forest to native code if treelite is available"""
+        if tl2cgen is None:
+            return None
+        
+        try:
+            logger.info(f"Compiling forest to {libpath}")
+            return CompiledForest.compile(forest, libpath)
+        except Exception as e:
+            logger.warning(f"Forest compilation failed, using packed arrays: {e}")
+            return None
+    
+    def _load_compiled_forest(self, libpath: Path, classes: np.ndarray) -> Optional[CompiledForest]:
+        """Load a previously compiled forest if treelite is available"""
+        if tl2cgen is None or not libpath.exists():
+            return None
+        
+        try:
+            return CompiledForest(libpath, classes)
+        except Exception as e:
+            logger.warning(f"Failed to load compiled forest {libpath}: {e}")
+            return None
+    
     async def _train_with_synthetic_data(self, model, scaler, model_name: str):
         """Train model with synthetic threat data"""
         logger.info(f"Training {model_name} with synthetic data...")
@@ -163,7 +624,7 @@ class ThreatDetector:
         # Train model
         if hasattr(model, 'fit'):
             if model_name == 'anomaly_detector':
-                # Isolation Forest doesn't need labels
+                # Half-space trees don't need labels
                 model.fit(X_train_scaled)
             else:
                 model.fit(X_train_scaled, y_train)
@@ -172,60 +633,17 @@ class ThreatDetector:
     
     def _generate_synthetic_training_data(self, model_name: str):
         """Generate synthetic training data for initial model training"""
-        np.random.seed(42)
-        n_samples = 10000
+        classes = _SYNTHETIC_CLASSES.get(model_name)
+        if classes is None:
+            return np.array([], dtype=np.float32), np.array([])
         
         # Use consistent feature count of 32 (matching real feature extraction)
-        n_features = 32
+        features, labels = _synthetic_training(10000, 32, 42, classes)
         
         if model_name == 'anomaly_detector':
-            # Features for anomaly detection
-            features = np.random.normal(0, 1, (n_samples, n_features))
-            # Add some anomalies
-            anomaly_indices = np.random.choice(n_samples, size=int(n_samples * 0.1), replace=False)
-            features[anomaly_indices] += np.random.normal(5, 2, (len(anomaly_indices), n_features))
-            
+            # Half-space trees train without labels
             return features, None
-        
-        elif model_name == 'threat_classifier':
-            # Features for threat classification
-            features = np.random.normal(0, 1, (n_samples, n_features))
-            
-            # Create threat labels
-            threat_types = ['normal', 'port_scan', 'dos', 'malware', 'phishing']
-            labels = np.random.choice(threat_types, n_samples)
-            
-            # Adjust features based on threat type
-            for i, label in enumerate(labels):
-                if label == 'port_scan':
-                    features[i, :5] += 3  # High connection rates
-                elif label == 'dos':
-                    features[i, 5:10] += 4  # High traffic volume
-                elif label == 'malware':
-                    features[i, 10:15] += 2  # Unusual network patterns
-                elif label == 'phishing':
-                    features[i, 15:20] += 1.5  # Suspicious DNS queries
-            
-            return features, labels
-        
-        elif model_name == 'behavioral_model':
-            # Features for behavioral analysis
-            features = np.random.normal(0, 1, (n_samples, n_features))
-            
-            # Create behavioral labels
-            behaviors = ['normal', 'suspicious', 'malicious']
-            labels = np.random.choice(behaviors, n_samples, p=[0.8, 0.15, 0.05])
-            
-            # Adjust features based on behavior
-            for i, label in enumerate(labels):
-                if label == 'suspicious':
-                    features[i, :10] += 1.5
-                elif label == 'malicious':
-                    features[i, :10] += 3
-            
-            return features, labels
-        
-        return np.array([]), np.array([])
+        return features, labels
     
     def _load_threat_patterns(self) -> List[ThreatPattern]:
         """Load known threat patterns"""
@@ -264,26 +682,35 @@ class ThreatDetector:
         
         return patterns
     
+    def _compile_threat_patterns(self):
+        """Precompile threat patterns into parallel NumPy arrays"""
+        patterns = self.threat_patterns
+        feature_index = {name: i for i, name in enumerate(PATTERN_FEATURE_NAMES)}
+        
+        self._p_names = np.array([pattern.name for pattern in patterns])
+        self._p_types = np.array([pattern.name.lower().replace(' ', '_') for pattern in patterns])
+        self._p_totals = np.array([len(pattern.thresholds) for pattern in patterns], dtype=np.float64)
+        self._p_thr = np.full((len(patterns), len(PATTERN_FEATURE_NAMES)), np.inf, dtype=np.float64)
+        self._p_mask = np.zeros((len(patterns), len(PATTERN_FEATURE_NAMES)), dtype=np.bool_)
+        self._p_scores = np.zeros(len(patterns), dtype=np.float64)
+        
+        for p, pattern in enumerate(patterns):
+            for feature_name, threshold in pattern.thresholds.items():
+                if feature_name in feature_index:
+                    self._p_thr[p, feature_index[feature_name]] = threshold
+                    self._p_mask[p, feature_index[feature_name]] = True
+    
     async def analyze_packet(self, packet_data):
         """Analyze network packet for threats"""
         try:
             # Extract features from packet
-            features = await self.feature_extractor.extract_packet_features(packet_data)
+            features = self.feature_extractor.extract_packet_features(packet_data)
             
             if features is None:
                 return
             
             # Add to feature buffer
-            self.feature_buffer.append({
-                'timestamp': packet_data.timestamp,
-                'features': features,
-                'source_ip': packet_data.src_ip,
-                'dest_ip': packet_data.dst_ip
-            })
-            
-            # Maintain buffer size
-            if len(self.feature_buffer) > self.buffer_size:
-                self.feature_buffer.pop(0)
+            self._buffer_features(features, packet_data)
             
             # Perform real-time analysis
             await self._analyze_features(features, packet_data)
@@ -291,11 +718,43 @@ class ThreatDetector:
         except Exception as e:
             logger.error(f"Error analyzing packet: {e}")
     
+    def _buffer_features(self, features: np.ndarray, packet_data):
+        """Write a feature record into the ring buffer, overwriting the oldest"""
+        if self._buf_feat is None or self._buf_feat.shape[1] != features.shape[0]:
+            self._buf_feat = np.empty((self.buffer_size, features.shape[0]), dtype=np.float32)
+            self._buf_idx = 0
+        
+        slot = self._buf_idx % self.buffer_size
+        self._buf_feat[slot] = features
+        self._buf_ts[slot] = packet_data.ts_ns
+        self._buf_src[slot] = packet_data.src_addr
+        self._buf_dst[slot] = packet_data.dst_addr
+        self._buf_idx += 1
+    
+    def get_buffered_features(self) -> Dict[str, np.ndarray]:
+        """Get buffered feature records as contiguous arrays, oldest first"""
+        count = min(self._buf_idx, self.buffer_size)
+        if self._buf_feat is None or count == 0:
+            return {
+                'timestamp': self._buf_ts[:0],
+                'features': np.empty((0, 0), dtype=np.float32),
+                'source_ip': self._buf_src[:0],
+                'dest_ip': self._buf_dst[:0]
+            }
+        
+        order = (np.arange(count) + self._buf_idx - count) % self.buffer_size
+        return {
+            'timestamp': self._buf_ts[order],
+            'features': self._buf_feat[order],
+            'source_ip': self._buf_src[order],
+            'dest_ip': self._buf_dst[order]
+        }
+    
     async def analyze_connection(self, connection_data):
         """Analyze network connection for threats"""
         try:
             # Extract features from connection
-            features = await self.feature_extractor.extract_connection_features(connection_data)
+            features = self.feature_extractor.extract_connection_features(connection_data)
             
             if features is None:
                 return
@@ -310,7 +769,7 @@ class ThreatDetector:
         """Analyze behavioral anomaly for potential threats"""
         try:
             # Convert anomaly data to features
-            features = await self.feature_extractor.extract_anomaly_features(anomaly_data)
+            features = self.feature_extractor.extract_anomaly_features(anomaly_data)
             
             if features is None:
                 return
@@ -330,9 +789,14 @@ class ThreatDetector:
             # Check against threat patterns
             pattern_matches = await self._check_threat_patterns(features, source_data)
             
+            # Scale once when both models share the same standardization
+            features_scaled = None
+            if self._scalers_share:
+                features_scaled = self._standardize(features, 'anomaly_detector')
+            
             # Use ML models for prediction
-            anomaly_score = await self._detect_anomaly(features)
-            threat_prediction = await self._classify_threat(features)
+            anomaly_score = await self._detect_anomaly(features, features_scaled)
+            threat_prediction = await self._classify_threat(features, features_scaled)
             
             # Combine results
             if anomaly_score < -0.5 or (threat_prediction and threat_prediction.confidence > 0.7):
@@ -360,45 +824,61 @@ class ThreatDetector:
         except Exception as e:
             logger.error(f"Error analyzing features: {e}")
     
-    async def _detect_anomaly(self, features: np.ndarray) -> float:
-        """Detect anomalies using isolation forest"""
+    async def _detect_anomaly(self, features: np.ndarray,
+                              features_scaled: Optional[np.ndarray] = None) -> float:
+        """Detect anomalies using half-space trees"""
         try:
             if 'anomaly_detector' not in self.models:
                 return 0.0
             
+            cache_key = self._prediction_cache_key(features)
+            score = self._get_cached_prediction('anomaly_detector', cache_key)
+            if score is not None:
+                return score
+            
             model = self.models['anomaly_detector']
-            scaler = self.scalers['anomaly_detector']
             
             # Scale features
-            features_scaled = scaler.transform(features.reshape(1, -1))
+            if features_scaled is None:
+                features_scaled = self._standardize(features, 'anomaly_detector')
             
             # Get anomaly score
             score = model.decision_function(features_scaled)[0]
             
+            self._set_cached_prediction('anomaly_detector', cache_key, score)
             return score
             
         except Exception as e:
             logger.error(f"Error detecting anomaly: {e}")
             return 0.0
     
-    async def _classify_threat(self, features: np.ndarray) -> Optional[ThreatPrediction]:
+    async def _classify_threat(self, features: np.ndarray,
+                               features_scaled: Optional[np.ndarray] = None) -> Optional[ThreatPrediction]:
         """Classify threat type using random forest"""
         try:
             if 'threat_classifier' not in self.models:
                 return None
             
-            model = self.models['threat_classifier']
-            scaler = self.scalers['threat_classifier']
-            
-            # Scale features
-            features_scaled = scaler.transform(features.reshape(1, -1))
-            
-            # Get prediction and probability
-            prediction = model.predict(features_scaled)[0]
-            probabilities = model.predict_proba(features_scaled)[0]
+            cache_key = self._prediction_cache_key(features)
+            cached = self._get_cached_prediction('threat_classifier', cache_key)
             
-            # Get confidence (max probability)
-            confidence = np.max(probabilities)
+            if cached is not None:
+                prediction, confidence = cached
+            else:
+                model = self.models['threat_classifier']
+                
+                # Scale features
+                if features_scaled is None:
+                    features_scaled = self._standardize(features, 'threat_classifier')
+                
+                # Get prediction and probability
+                prediction = model.predict(features_scaled)[0]
+                probabilities = model.predict_proba(features_scaled)[0]
+                
+                # Get confidence (max probability)
+                confidence = np.max(probabilities)
+                
+                self._set_cached_prediction('threat_classifier', cache_key, (prediction, confidence))
             
             if prediction != 'normal' and confidence > self.config['confidence_threshold']:
                 return ThreatPrediction(
@@ -418,88 +898,65 @@ class ThreatDetector:
             logger.error(f"Error classifying threat: {e}")
             return None
     
+    def _prediction_cache_key(self, features: np.ndarray) -> bytes:
+        """Quantize features to a hashable key for the prediction cache"""
+        return (features * 100).astype(np.int32).tobytes()
+    
+    def _get_cached_prediction(self, model_name: str, cache_key: bytes):
+        """Get a cached model output, marking it as most recently used"""
+        cache = self._prediction_cache[model_name]
+        result = cache.get(cache_key)
+        if result is not None:
+            cache.move_to_end(cache_key)
+        return result
+    
+    def _set_cached_prediction(self, model_name: str, cache_key: bytes, result):
+        """Store a model output, evicting the least recently used entry"""
+        cache = self._prediction_cache[model_name]
+        cache[cache_key] = result
+        if len(cache) > self.prediction_cache_size:
+            cache.popitem(last=False)
+    
     async def _check_threat_patterns(self, features: np.ndarray, source_data) -> List[ThreatPrediction]:
         """Check features against known threat patterns"""
         matches = []
         
         try:
-            # Convert features to named dict (this would need proper mapping)
-            feature_dict = self._features_to_dict(features)
+            # Score all patterns in a single native pass over the feature vector
+            _score_patterns(features, self._p_thr, self._p_mask, self._p_scores)
+            
+            confidences = self._p_scores / self._p_totals
             
-            for pattern in self.threat_patterns:
-                match_score = 0
-                total_checks = len(pattern.thresholds)
+            # If most thresholds are exceeded, consider it a match
+            for p in np.flatnonzero(confidences >= 0.7):
+                confidence = float(confidences[p])
+                pattern_name = str(self._p_names[p])
                 
-                for feature_name, threshold in pattern.thresholds.items():
-                    if feature_name in feature_dict:
-                        if feature_dict[feature_name] >= threshold:
-                            match_score += 1
+                threat = ThreatPrediction(
+                    timestamp=datetime.utcnow(),
+                    threat_type=str(self._p_types[p]),
+                    confidence=confidence,
+                    source_ip=getattr(source_data, 'src_ip', 'unknown'),
+                    target_ip=getattr(source_data, 'dst_ip', 'unknown'),
+                    indicators={'pattern_match': pattern_name, 'match_score': int(self._p_scores[p])},
+                    risk_level=self._calculate_risk_level(confidence),
+                    recommended_actions=self._get_recommended_actions(pattern_name)
+                )
                 
-                # If most thresholds are exceeded, consider it a match
-                if match_score / total_checks >= 0.7:
-                    confidence = match_score / total_checks
-                    
-                    threat = ThreatPrediction(
-                        timestamp=datetime.utcnow(),
-                        threat_type=pattern.name.lower().replace(' ', '_'),
-                        confidence=confidence,
-                        source_ip=getattr(source_data, 'src_ip', 'unknown'),
-                        target_ip=getattr(source_data, 'dst_ip', 'unknown'),
-                        indicators={'pattern_match': pattern.name, 'match_score': match_score},
-                        risk_level=self._calculate_risk_level(confidence),
-                        recommended_actions=self._get_recommended_actions(pattern.name)
-                    )
-                    
-                    matches.append(threat)
+                matches.append(threat)
             
         except Exception as e:
             logger.error(f"Error checking threat patterns: {e}")
         
         return matches
     
-    def _features_to_dict(self, features: np.ndarray) -> Dict[str, float]:
-        """Convert feature array to named dictionary"""
-        # This would need proper feature mapping based on the feature extractor
-        feature_names = [
-            'connection_rate', 'packet_rate', 'bandwidth_usage',
-            'unique_ports', 'failed_connections', 'outbound_traffic',
-            'unusual_hours', 'data_volume', 'internal_connections',
-            'privilege_escalation', 'system_discovery', 'network_scanning',
-            'service_enumeration', 'vulnerability_probing', 'source_diversity'
-        ]
-        
-        result = {}
-        for i, name in enumerate(feature_names):
-            if i < len(features):
-                result[name] = float(features[i])
-        
-        return result
-    
     def _calculate_risk_level(self, confidence: float) -> str:
         """Calculate risk level based on confidence"""
-        if confidence >= 0.9:
-            return "critical"
-        elif confidence >= 0.7:
-            return "high"
-        elif confidence >= 0.5:
-            return "medium"
-        else:
-            return "low"
+        return _RISK_LABELS[bisect.bisect_right(_RISK_EDGES, confidence)]
     
-    def _get_recommended_actions(self, threat_type: str) -> List[str]:
+    def _get_recommended_actions(self, threat_type: str) -> Tuple[str, ...]:
         """Get recommended actions for threat type"""
-        actions_map = {
-            'port_scan': ['block_source_ip', 'increase_monitoring', 'deploy_honeypot'],
-            'dos': ['rate_limit', 'block_source_ip', 'scale_resources'],
-            'ddos': ['activate_ddos_protection', 'contact_isp', 'emergency_response'],
-            'malware': ['isolate_system', 'run_antivirus', 'forensic_analysis'],
-            'phishing': ['block_domain', 'user_education', 'email_filtering'],
-            'data_exfiltration': ['block_connection', 'investigate_user', 'audit_access'],
-            'lateral_movement': ['isolate_network_segment', 'reset_credentials', 'incident_response'],
-            'reconnaissance': ['deploy_deception', 'increase_logging', 'monitor_closely']
-        }
-        
-        return actions_map.get(threat_type, ['investigate', 'monitor', 'alert_admin'])
+        return _ACTIONS_MAP.get(threat_type, _DEFAULT_ACTIONS)
     
     async def _handle_threat_detection(self, threat: ThreatPrediction):
         """Handle detected threat"""
@@ -508,12 +965,18 @@ class ThreatDetector:
         # Update statistics
         self.model_stats['threats_detected'] += 1
         
-        # Notify callbacks
-        for callback in self._threat_callbacks:
+        # Notify callbacks concurrently with a single shared payload; each call is
+        # guarded so a callback that raises before awaiting, or returns a
+        # non-awaitable, cannot abort the others
+        payload = threat.__dict__
+        
+        async def notify(callback):
             try:
-                await callback(threat.__dict__)
+                await callback(payload)
             except Exception as e:
                 logger.error(f"Error in threat callback: {e}")
+        
+        await asyncio.gather(*(notify(callback) for callback in self._threat_callbacks))
     
     async def update_threat_indicators(self, ioc_data):
         """Update models with new threat indicators"""
@@ -542,8 +1005,9 @@ class ThreatDetector:
     
     async def _retrain_models(self):
         """Retrain models with new data"""
-        # This would implement incremental learning or full retraining
-        # For now, just log the intention
+        # The buffered packet features are wider than the synthetic training
+        # features, so they cannot update the models until both share a schema;
+        # this would implement incremental learning or full retraining
         logger.info("Model retraining logic would be implemented here")
     
     async def _update_threat_patterns(self):
@@ -0,0 +1,63 @@
+"""
+Fast packet header parsing
+Extracts IPv4/TCP/UDP/ICMP header fields from raw Ethernet frames with struct
+"""
+
+import struct
+from typing import Optional, Tuple
+
+ETH_HEADER_LEN = 14
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_VLAN = 0x8100
+
+PROTO_ICMP = 1
+PROTO_TCP = 6
+PROTO_UDP = 17
+
+_ETHERTYPE = struct.Struct('!H')
+# version/IHL, TOS, total length, id, flags/fragment, TTL, protocol, checksum, src, dst
+_IPV4_HEADER = struct.Struct('!BBHHHBBHII')
+_PORTS = struct.Struct('!HH')
+_TCP_FLAGS_OFFSET = 13
+_ICMP_TYPE_CODE = struct.Struct('!BB')
+
+# (src_ip, dst_ip, src_port, dst_port, proto, flags)
+ParsedHeader = Tuple[int, int, int, int, int, int]
+
+def parse_frame(buf) -> Optional[ParsedHeader]:
+    """Parse an Ethernet frame into integer header fields
+
+    IP addresses are returned as host-order integers and ports are 0 when
+    the transport has none. flags holds the TCP flags byte for TCP and
+    (type << 8) | code for ICMP. Returns None for non-IPv4 or truncated frames.
+    """
+    try:
+        offset = ETH_HEADER_LEN
+        ethertype = _ETHERTYPE.unpack_from(buf, 12)[0]
+
+        if ethertype == ETHERTYPE_VLAN:
+            ethertype = _ETHERTYPE.unpack_from(buf, 16)[0]
+            offset += 4
+
+        if ethertype != ETHERTYPE_IPV4:
+            return None
+
+        ver_ihl, _, _, _, _, _, proto, _, src_ip, dst_ip = _IPV4_HEADER.unpack_from(buf, offset)
+        l4 = offset + (ver_ihl & 0x0F) * 4
+
+        if proto == PROTO_TCP:
+            src_port, dst_port = _PORTS.unpack_from(buf, l4)
+            return src_ip, dst_ip, src_port, dst_port, proto, buf[l4 + _TCP_FLAGS_OFFSET]
+
+        if proto == PROTO_UDP:
+            src_port, dst_port = _PORTS.unpack_from(buf, l4)
+            return src_ip, dst_ip, src_port, dst_port, proto, 0
+
+        if proto == PROTO_ICMP:
+            icmp_type, icmp_code = _ICMP_TYPE_CODE.unpack_from(buf, l4)
+            return src_ip, dst_ip, 0, 0, proto, (icmp_type << 8) | icmp_code
+
+        return src_ip, dst_ip, 0, 0, proto, 0
+
+    except (struct.error, IndexError):
+        return None
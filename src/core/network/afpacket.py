@@ -0,0 +1,185 @@
+"""
+AF_PACKET Capture Backend
+Zero-copy packet capture from a memory-mapped TPACKET_V3 kernel ring
+"""
+
+import ctypes
+import mmap
+import socket
+import struct
+from typing import Callable, Optional, Sequence, Tuple
+
+# Linux packet socket constants (linux/if_packet.h, linux/if_ether.h)
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_VERSION = 10
+PACKET_FANOUT = 18
+PACKET_FANOUT_HASH = 0
+TPACKET_V3 = 2
+ETH_P_ALL = 0x0003
+SO_ATTACH_FILTER = 26
+
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+
+# struct tpacket_req3
+_RING_REQ = struct.Struct('=IIIIIII')
+# struct tpacket_block_desc + tpacket_hdr_v1 (leading fields)
+_BLOCK_HDR = struct.Struct('=IIIII')
+_BLOCK_STATUS = struct.Struct('=I')
+_BLOCK_STATUS_OFFSET = 8
+# struct tpacket3_hdr (leading fields)
+_PACKET_HDR = struct.Struct('=IIIIIIHH')
+# struct sock_filter / struct sock_fprog
+_BPF_INSN = struct.Struct('=HBBI')
+_BPF_PROG = struct.Struct('HP')
+
+# Classic BPF instruction: (code, jt, jf, k)
+BPFInstruction = Tuple[int, int, int, int]
+
+# Accepts IPv4 TCP SYN without ACK and TCP/UDP to ports above 65000,
+# matching the monitor's SUSPICIOUS_FILTER expression
+SUSPICIOUS_BPF: Tuple[BPFInstruction, ...] = (
+    (0x28, 0, 0, 12),       # ldh [12]              ethertype
+    (0x15, 0, 14, 0x0800),  # jeq #IPv4 else drop
+    (0x30, 0, 0, 23),       # ldb [23]              protocol
+    (0x15, 1, 0, 6),        # jeq #TCP
+    (0x15, 0, 11, 17),      # jeq #UDP else drop
+    (0x28, 0, 0, 20),       # ldh [20]              fragment offset
+    (0x45, 9, 0, 0x1FFF),   # jset #0x1fff -> drop
+    (0xB1, 0, 0, 14),       # ldxb 4*([14]&0xf)     IP header length
+    (0x48, 0, 0, 16),       # ldh [x+16]            destination port
+    (0x25, 5, 0, 65000),    # jgt #65000 -> accept
+    (0x30, 0, 0, 23),       # ldb [23]              protocol
+    (0x15, 0, 4, 6),        # jeq #TCP else drop
+    (0x50, 0, 0, 27),       # ldb [x+27]            TCP flags
+    (0x54, 0, 0, 0x12),     # and #SYN|ACK
+    (0x15, 0, 1, 0x02),     # jeq #SYN else drop
+    (0x06, 0, 0, 0x40000),  # ret #262144           accept
+    (0x06, 0, 0, 0),        # ret #0                drop
+)
+
+def attach_filter(sock: socket.socket, program: Sequence[BPFInstruction]):
+    """Attach a classic BPF program to a socket"""
+    insns = ctypes.create_string_buffer(b''.join(_BPF_INSN.pack(*insn) for insn in program))
+    fprog = _BPF_PROG.pack(len(program), ctypes.addressof(insns))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+class AFPacketRing:
+    """Packet capture from a TPACKET_V3 memory-mapped receive ring"""
+
+    def __init__(self, interface: str, block_size: int = 1 << 22, block_count: int = 4,
+                 frame_size: int = 2048, retire_timeout_ms: int = 60,
+                 bpf_filter: Optional[Sequence[BPFInstruction]] = None,
+                 fanout_group: Optional[int] = None):
+        self.interface = interface
+        self.block_size = block_size
+        self.block_count = block_count
+        self.frame_size = frame_size
+        self.retire_timeout_ms = retire_timeout_ms
+        self.bpf_filter = bpf_filter
+        self.fanout_group = fanout_group
+
+        self.sock = None
+        self._ring = None
+        self._view = None
+        self._block_idx = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the ring is open"""
+        return self.sock is not None
+
+    def start(self):
+        """Open the packet socket, map the receive ring and bind to the interface"""
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+
+        try:
+            sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+            sock.setsockopt(SOL_PACKET, PACKET_RX_RING, _RING_REQ.pack(
+                self.block_size,
+                self.block_count,
+                self.frame_size,
+                (self.block_size // self.frame_size) * self.block_count,
+                self.retire_timeout_ms,
+                0,  # sizeof_priv
+                0   # feature_req_word
+            ))
+
+            self._ring = mmap.mmap(
+                sock.fileno(),
+                self.block_size * self.block_count,
+                mmap.MAP_SHARED,
+                mmap.PROT_READ | mmap.PROT_WRITE
+            )
+            self._view = memoryview(self._ring)
+
+            # Filter in the kernel before frames reach the ring
+            if self.bpf_filter:
+                attach_filter(sock, self.bpf_filter)
+
+            sock.bind((self.interface, ETH_P_ALL))
+            sock.setblocking(False)
+
+            # Share the interface's traffic with the other rings in the group, split by flow
+            if self.fanout_group is not None:
+                sock.setsockopt(SOL_PACKET, PACKET_FANOUT, self.fanout_group | (PACKET_FANOUT_HASH << 16))
+
+        except Exception:
+            if self._view is not None:
+                self._view.release()
+                self._view = None
+            if self._ring is not None:
+                self._ring.close()
+                self._ring = None
+            sock.close()
+            raise
+
+        self.sock = sock
+        self._block_idx = 0
+
+    def stop(self):
+        """Unmap the ring and close the socket"""
+        if self.sock is None:
+            return
+
+        self._view.release()
+        self._ring.close()
+        self.sock.close()
+
+        self._view = None
+        self._ring = None
+        self.sock = None
+
+    def fileno(self) -> int:
+        """File descriptor to poll for ready blocks"""
+        return self.sock.fileno()
+
+    def drain(self, handler: Callable[[memoryview, int, int], None]) -> int:
+        """Pass every frame of each ready block to handler(frame, ts_ns, wire_len)
+
+        Frames are views into the ring and are only valid during the call.
+        Blocks are handed back to the kernel once processed, and draining
+        stops at the first block still owned by the kernel.
+        """
+        view = self._view
+        count = 0
+
+        while True:
+            block = self._block_idx * self.block_size
+            _, _, status, num_pkts, first_pkt = _BLOCK_HDR.unpack_from(view, block)
+
+            if not status & TP_STATUS_USER:
+                break
+
+            pkt = block + first_pkt
+            for _ in range(num_pkts):
+                next_offset, sec, nsec, snaplen, wire_len, _, mac, _ = _PACKET_HDR.unpack_from(view, pkt)
+                handler(view[pkt + mac:pkt + mac + snaplen], sec * 1_000_000_000 + nsec, wire_len)
+                pkt += next_offset
+
+            count += num_pkts
+            _BLOCK_STATUS.pack_into(view, block + _BLOCK_STATUS_OFFSET, TP_STATUS_KERNEL)
+            self._block_idx = (self._block_idx + 1) % self.block_count
+
+        return count
@@ -0,0 +1,198 @@
+"""
+Fanout Packet Capture
+Spreads an interface's capture across worker processes with PACKET_FANOUT
+"""
+
+import multiprocessing
+import os
+import queue
+import select
+import threading
+from multiprocessing.connection import Connection
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+from .afpacket import AFPacketRing
+from ...utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes of each frame forwarded by workers: enough for the headers and payload preview
+CAPTURE_SNAPLEN = 128
+
+# (frame head, ts_ns, wire_len)
+CapturedFrame = Tuple[bytes, int, int]
+
+# Batches buffered between the workers and the reader; workers drop beyond this
+MAX_PENDING_BATCHES = 256
+
+# Seconds to wait for each worker to report whether its ring started
+STARTUP_TIMEOUT = 10.0
+
+_next_group = 0
+
+def _fanout_worker(interface: str, fanout_group: int, ring_options: Dict[str, Any],
+                   frames: multiprocessing.Queue, dropped: multiprocessing.Value,
+                   stop: multiprocessing.Event, cpu: Optional[int], ready: Connection):
+    """Drain one member ring of a fanout group and forward frames in batches
+    
+    Whether the ring started is reported on ready: None on success, otherwise the error.
+    Batches that do not fit in the bounded frames queue are counted in dropped.
+    """
+    try:
+        # Keep the worker on its own core so its ring stays cache-hot
+        if cpu is not None and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {cpu})
+        
+        ring = AFPacketRing(interface, fanout_group=fanout_group, **ring_options)
+        ring.start()
+    except Exception as e:
+        ready.send(f"{type(e).__name__}: {e}")
+        ready.close()
+        return
+    
+    ready.send(None)
+    ready.close()
+    
+    poller = select.poll()
+    poller.register(ring.fileno(), select.POLLIN)
+    
+    try:
+        while not stop.is_set():
+            poller.poll(100)
+            
+            batch = []
+            ring.drain(lambda frame, ts_ns, wire_len: batch.append(
+                (bytes(frame[:CAPTURE_SNAPLEN]), ts_ns, wire_len)
+            ))
+            
+            if batch:
+                try:
+                    frames.put_nowait(batch)
+                except queue.Full:
+                    # The parent is falling behind, so shed load instead of buffering it
+                    with dropped.get_lock():
+                        dropped.value += len(batch)
+    
+    except KeyboardInterrupt:
+        pass
+    
+    finally:
+        ring.stop()
+
+class FanoutCapture:
+    """Capture on one interface with a group of AF_PACKET rings in worker processes"""
+    
+    def __init__(self, interface: str, workers: int, on_batch: Callable[[List[CapturedFrame]], None],
+                 ring_options: Optional[Dict[str, Any]] = None, cpus: Optional[Sequence[int]] = None,
+                 on_drop: Optional[Callable[[int], None]] = None):
+        global _next_group
+        
+        self.interface = interface
+        self.workers = workers
+        self.on_batch = on_batch
+        self.on_drop = on_drop
+        self.ring_options = ring_options or {}
+        self.cpus = list(cpus or [])
+        
+        # Fanout group ids are per network namespace, so keep them unique per process
+        self.fanout_group = (os.getpid() + _next_group) & 0xFFFF
+        _next_group += 1
+        
+        self._ctx = multiprocessing.get_context('spawn')
+        self._frames = self._ctx.Queue(maxsize=MAX_PENDING_BATCHES)
+        self._dropped = self._ctx.Value('Q', 0)
+        self._stop = self._ctx.Event()
+        self._processes: List[multiprocessing.Process] = []
+        self._reader: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether every worker is alive"""
+        return bool(self._processes) and all(p.is_alive() for p in self._processes)
+    
+    @property
+    def dropped(self) -> int:
+        """Frames the workers dropped because the batch queue was full"""
+        return self._dropped.value
+    
+    def start(self):
+        """Start the capture workers and the batch reader
+        
+        Raises RuntimeError if any worker fails to start its ring.
+        """
+        handshakes = []
+        for i in range(self.workers):
+            ready_recv, ready_send = self._ctx.Pipe(duplex=False)
+            process = self._ctx.Process(
+                target=_fanout_worker,
+                args=(self.interface, self.fanout_group, self.ring_options, self._frames, self._dropped, self._stop,
+                      self.cpus[i % len(self.cpus)] if self.cpus else None, ready_send),
+                name=f"capture-{self.interface}-{i}",
+                daemon=True
+            )
+            process.start()
+            ready_send.close()
+            self._processes.append(process)
+            handshakes.append(ready_recv)
+        
+        # Wait for every worker to report its ring before declaring the capture up
+        errors = []
+        for i, ready_recv in enumerate(handshakes):
+            try:
+                if not ready_recv.poll(STARTUP_TIMEOUT):
+                    errors.append(f"worker {i} did not report within {STARTUP_TIMEOUT}s")
+                    continue
+                error = ready_recv.recv()
+                if error is not None:
+                    errors.append(f"worker {i}: {error}")
+            except EOFError:
+                errors.append(f"worker {i} exited before starting its ring")
+            finally:
+                ready_recv.close()
+        
+        if errors:
+            self.stop()
+            raise RuntimeError(f"Fanout capture failed to start on {self.interface}: {'; '.join(errors)}")
+        
+        self._reader = threading.Thread(target=self._read_batches, name=f"capture-{self.interface}-reader", daemon=True)
+        self._reader.start()
+    
+    def stop(self):
+        """Stop the workers and the batch reader"""
+        self._stop.set()
+        
+        for process in self._processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        
+        if self._reader:
+            self._reader.join(timeout=2)
+        
+        self._processes = []
+        self._reader = None
+    
+    def _read_batches(self):
+        """Hand batches from the workers to on_batch, and new drops to on_drop, until stopped"""
+        reported = 0
+        while not self._stop.is_set():
+            try:
+                batch = self._frames.get(timeout=0.5)
+            except queue.Empty:
+                batch = None
+            
+            dropped = self._dropped.value
+            if dropped != reported and self.on_drop:
+                try:
+                    self.on_drop(dropped - reported)
+                except Exception as e:
+                    logger.error(f"Error reporting capture drops on {self.interface}: {e}")
+                reported = dropped
+            
+            if batch is None:
+                continue
+            
+            try:
+                self.on_batch(batch)
+            except Exception as e:
+                logger.error(f"Error handing off capture batch on {self.interface}: {e}")
@@ -4,44 +4,181 @@ Real-time network packet capture and analysis
 """
 
 import asyncio
+import functools
+import ipaddress
 import logging
-from typing import List, Dict, Any, Callable, Optional
+import sys
+from collections import deque
+from enum import Enum
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
-import json
+import socket
+import struct
+
+import numpy as np
+import psutil
 
 try:
-    from scapy.all import AsyncSniffer, Packet, IP, TCP, UDP, ARP
-    from scapy.layers.inet import ICMP
+    from numba import njit
 except ImportError:
-    # Fallback for environments without scapy
-    class AsyncSniffer:
-        def __init__(self, *args, **kwargs):
-            pass
-        def start(self): pass
-        def stop(self): pass
+    # Fallback for environments without numba: run the kernels as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
-import psutil
+from .afpacket import AFPacketRing, SUSPICIOUS_BPF
+from .fanout import FanoutCapture, CapturedFrame
+from . import proc_net
+from ._fastparse import parse_frame, ParsedHeader, ETH_HEADER_LEN, PROTO_ICMP, PROTO_TCP, PROTO_UDP
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-@dataclass
+# Maximum packets handed to callbacks per consumer wakeup
+DISPATCH_BATCH_SIZE = 128
+
+# Periodic statistics log line, filled from NetworkMonitor.stats
+STATS_FORMAT = ("Network monitoring stats: packets={packets_captured} dropped={packets_dropped} "
+                "conns={connections_tracked} suspicious={suspicious_activities}")
+
+# Seconds between second-chance sweeps of the connection tracker
+CONNECTION_GC_INTERVAL = 60
+# Reference bits given to a connection each time it is seen
+CONNECTION_REF_BITS = 0b11
+
+# Capture filters: everything analysed, or only traffic the threat heuristics flag
+ALL_FILTER = "tcp or udp or icmp or arp"
+SUSPICIOUS_FILTER = "(tcp[tcpflags] & (tcp-syn|tcp-ack) == tcp-syn) or ((tcp or udp) and dst portrange 65001-65535)"
+
+class _NullSniffer:
+    """Fallback sniffer for environments without scapy"""
+    def __init__(self, *args, **kwargs):
+        pass
+    def start(self): pass
+    def stop(self): pass
+
+def _async_sniffer_class():
+    """Import scapy's AsyncSniffer only when the scapy backend is used, since scapy.all is slow to load"""
+    try:
+        from scapy.all import AsyncSniffer
+    except ImportError:
+        return _NullSniffer
+    return AsyncSniffer
+
+@functools.lru_cache(maxsize=65536)
+def _format_ip(ip: int) -> str:
+    """Format an integer IPv4 address as a dotted-quad string, interned per address"""
+    return socket.inet_ntoa(struct.pack('!I', ip))
+
+@functools.lru_cache(maxsize=65536)
+def _ip_to_int(ip: str) -> int:
+    """Convert an IPv4 or IPv6 address string to an integer"""
+    return int(ipaddress.ip_address(ip))
+
+# (local address << 16 | local port, remote address << 16 | remote port)
+ConnectionKey = Tuple[int, int]
+
+def _connection_key(connection) -> ConnectionKey:
+    """Pack a psutil connection's endpoints into an integer key"""
+    return (_ip_to_int(connection.laddr.ip) << 16 | connection.laddr.port,
+            _ip_to_int(connection.raddr.ip) << 16 | connection.raddr.port)
+
+# TCP flag bits as carried in NetworkPacket.tcp_flags
+TCP_FIN = 0x01
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_PSH = 0x08
+TCP_ACK = 0x10
+TCP_URG = 0x20
+
+@njit(cache=True)
+def _classify_headers(headers, out):
+    """Flag SYN scans and traffic to ports above 65000 in a batch of parsed headers"""
+    for i in range(headers.shape[0]):
+        flags = headers[i, 5]
+        syn_scan = headers[i, 4] == PROTO_TCP and (flags & TCP_SYN) != 0 and (flags & TCP_ACK) == 0
+        out[i] = syn_scan or headers[i, 3] > 65000
+
+def _fuse_callbacks(callbacks: List[Callable], kind: str) -> Callable:
+    """Build one dispatcher for a callback list, resolving which ones to await up front"""
+    entries = tuple((callback, asyncio.iscoroutinefunction(callback)) for callback in callbacks)
+    
+    async def dispatch(event):
+        for callback, is_async in entries:
+            try:
+                if is_async:
+                    await callback(event)
+                else:
+                    callback(event)
+            except Exception as e:
+                logger.error(f"Error in {kind} callback: {e}")
+    
+    return dispatch
+
+class CaptureBackend(Enum):
+    """Packet capture backend"""
+    SCAPY = 'scapy'
+    AF_PACKET_V3 = 'af_packet_v3'
+
+@dataclass(frozen=True)
 class NetworkPacket:
-    """Network packet data structure"""
-    timestamp: datetime
-    src_ip: str
-    dst_ip: str
+    """Network packet data structure
+    
+    ts_ns is the capture time in nanoseconds since the epoch and addresses
+    are host-order IPv4 integers, formatted only when read as src_ip/dst_ip. tcp_flags
+    holds the TCP flags byte for TCP packets and (type << 8) | code for
+    ICMP packets. payload_head is empty unless payload previews are enabled.
+    """
+    __slots__ = ('ts_ns', 'src_addr', 'dst_addr', 'src_port', 'dst_port',
+                 'protocol', 'size', 'tcp_flags', 'payload_head')
+    
+    ts_ns: int
+    src_addr: int
+    dst_addr: int
     src_port: Optional[int]
     dst_port: Optional[int]
     protocol: str
     size: int
-    flags: Dict[str, Any]
-    payload_preview: str
+    tcp_flags: int
+    payload_head: bytes
+    
+    syn = property(lambda s: bool(s.tcp_flags & TCP_SYN))
+    ack = property(lambda s: bool(s.tcp_flags & TCP_ACK))
+    fin = property(lambda s: bool(s.tcp_flags & TCP_FIN))
+    rst = property(lambda s: bool(s.tcp_flags & TCP_RST))
+    psh = property(lambda s: bool(s.tcp_flags & TCP_PSH))
+    urg = property(lambda s: bool(s.tcp_flags & TCP_URG))
+    icmp_type = property(lambda s: s.tcp_flags >> 8)
+    icmp_code = property(lambda s: s.tcp_flags & 0xFF)
+    
+    @property
+    def src_ip(self) -> str:
+        """Source address as a dotted-quad string"""
+        return _format_ip(self.src_addr)
+    
+    @property
+    def dst_ip(self) -> str:
+        """Destination address as a dotted-quad string"""
+        return _format_ip(self.dst_addr)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Capture time as a naive UTC datetime"""
+        return datetime.utcfromtimestamp(self.ts_ns / 1e9)
+    
+    @property
+    def payload_preview(self) -> str:
+        """Hex encoding of the captured payload head"""
+        return self.payload_head.hex()
 
 @dataclass
 class ConnectionEvent:
     """Network connection event"""
+    __slots__ = ('timestamp', 'event_type', 'src_ip', 'dst_ip', 'src_port', 'dst_port',
+                 'protocol', 'bytes_transferred', 'connection_duration')
+    
     timestamp: datetime
     event_type: str  # 'connection', 'disconnection', 'data_transfer'
     src_ip: str
@@ -52,6 +189,21 @@ class ConnectionEvent:
     bytes_transferred: int
     connection_duration: Optional[float]
 
+@dataclass
+class ConnectionState:
+    """Tracked state of an established connection
+    
+    ref_bits is refreshed whenever the connection is seen and halved by each
+    garbage collection sweep; the entry is evicted once it reaches zero.
+    """
+    __slots__ = ('start_time', 'bytes_sent', 'bytes_received', 'pid', 'ref_bits')
+    
+    start_time: datetime
+    bytes_sent: int
+    bytes_received: int
+    pid: Optional[int]
+    ref_bits: int
+
 class NetworkMonitor:
     """Real-time network traffic monitor"""
     
@@ -60,15 +212,28 @@ class NetworkMonitor:
         self.config = config
         self.running = False
         self.sniffers = {}
-        self.connection_tracker = {}
+        self.connection_tracker: Dict[ConnectionKey, ConnectionState] = {}
+        self._socket_keys: Dict[int, ConnectionKey] = {}  # socket inode -> tracker key
+        self.capture_backend = self._select_capture_backend()
+        self.suspicious_only = config.get('capture', {}).get('filter') == 'suspicious'
+        self.payload_preview = config.get('capture', {}).get('payload_preview', True)
+        
+        # Captured frames awaiting processing, filled by the capture path
+        self._queue = deque(maxlen=config.get('capture_buffer_size', 65536))
+        self._wake: Optional[asyncio.Event] = None
+        self._suspicious = np.zeros(DISPATCH_BATCH_SIZE, dtype=np.bool_)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Event callbacks
         self._packet_callbacks: List[Callable] = []
         self._connection_callbacks: List[Callable] = []
+        self._dispatch_packets = _fuse_callbacks(self._packet_callbacks, 'packet')
+        self._dispatch_connection = _fuse_callbacks(self._connection_callbacks, 'connection')
         
         # Statistics
         self.stats = {
             'packets_captured': 0,
+            'packets_dropped': 0,
             'connections_tracked': 0,
             'suspicious_activities': 0
         }
@@ -78,6 +243,11 @@ class NetworkMonitor:
         logger.info(f"Starting network monitoring on interfaces: {self.interfaces}")
         
         self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        
+        # Start packet processing
+        asyncio.create_task(self._consume_packets())
         
         # Start packet capture on each interface
         for interface in self.interfaces:
@@ -88,6 +258,7 @@ class NetworkMonitor:
         
         # Start connection tracking
         asyncio.create_task(self._track_connections())
+        asyncio.create_task(self._collect_connections())
         
         # Start periodic statistics reporting
         asyncio.create_task(self._report_statistics())
@@ -96,26 +267,44 @@ class NetworkMonitor:
         """Stop network monitoring"""
         logger.info("Stopping network monitoring...")
         self.running = False
+        if self._wake:
+            self._wake.set()
         
         # Stop all sniffers
         for interface, sniffer in self.sniffers.items():
             try:
+                if isinstance(sniffer, AFPacketRing) and sniffer.running:
+                    asyncio.get_running_loop().remove_reader(sniffer.fileno())
                 sniffer.stop()
                 logger.info(f"Stopped monitoring on {interface}")
             except Exception as e:
                 logger.error(f"Error stopping sniffer on {interface}: {e}")
     
+    def _select_capture_backend(self) -> CaptureBackend:
+        """Select capture backend from config, preferring AF_PACKET on Linux"""
+        default = CaptureBackend.AF_PACKET_V3 if sys.platform.startswith('linux') else CaptureBackend.SCAPY
+        backend = self.config.get('capture', {}).get('backend')
+        return CaptureBackend(backend) if backend else default
+    
     async def _start_interface_monitoring(self, interface: str):
         """Start monitoring on a specific interface"""
+        if self.capture_backend == CaptureBackend.AF_PACKET_V3:
+            try:
+                await self._start_ring_capture(interface)
+                return
+            except Exception as e:
+                logger.warning(f"AF_PACKET capture unavailable on {interface}, falling back to scapy: {e}")
+        
         try:
             # Create packet filter based on configuration
             packet_filter = self._build_packet_filter()
             
             # Start async sniffer
+            AsyncSniffer = _async_sniffer_class()
             sniffer = AsyncSniffer(
                 iface=interface,
                 filter=packet_filter,
-                prn=lambda pkt: asyncio.create_task(self._process_packet(pkt, interface)),
+                prn=lambda pkt: self._enqueue_threadsafe(bytes(pkt), int(pkt.time * 1e9), len(pkt), interface),
                 store=False  # Don't store packets in memory
             )
             
@@ -128,144 +317,189 @@ class NetworkMonitor:
             logger.error(f"Failed to start sniffer on {interface}: {e}")
             raise
     
+    async def _start_ring_capture(self, interface: str):
+        """Start zero-copy AF_PACKET ring capture on an interface"""
+        capture_config = self.config.get('capture', {})
+        ring_options = {
+            'block_size': capture_config.get('block_size', 1 << 22),
+            'block_count': capture_config.get('block_count', 4),
+            'bpf_filter': SUSPICIOUS_BPF if self.suspicious_only else None
+        }
+        
+        workers = capture_config.get('workers', 1)
+        if workers > 1:
+            # Spread the interface across worker processes, one ring each
+            capture = FanoutCapture(
+                interface,
+                workers,
+                lambda batch: self._enqueue_batch_threadsafe(batch, interface),
+                ring_options,
+                cpus=capture_config.get('cpus'),
+                on_drop=self._count_dropped
+            )
+            
+            # start() waits for every worker's ring and raises if any failed,
+            # so a broken fanout falls back to scapy like a broken ring
+            await asyncio.get_running_loop().run_in_executor(None, capture.start)
+            self.sniffers[interface] = capture
+            
+            logger.info(f"Started AF_PACKET fanout capture on {interface} with {workers} workers")
+            return
+        
+        ring = AFPacketRing(interface, **ring_options)
+        ring.start()
+        
+        # Drain the ring from the event loop whenever the socket is readable
+        asyncio.get_running_loop().add_reader(ring.fileno(), self._drain_ring, ring, interface)
+        self.sniffers[interface] = ring
+        
+        logger.info(f"Started AF_PACKET ring capture on {interface}")
+    
+    def _drain_ring(self, ring: AFPacketRing, interface: str):
+        """Process every frame currently available in a capture ring"""
+        try:
+            if ring.drain(lambda frame, ts_ns, wire_len: self._enqueue(bytes(frame), ts_ns, wire_len, interface)):
+                self._wake.set()
+        except Exception as e:
+            logger.error(f"Error draining capture ring on {interface}: {e}")
+    
     def _build_packet_filter(self) -> str:
         """Build BPF filter for packet capture"""
-        # Basic filter to capture relevant traffic
-        filters = [
-            "tcp",  # TCP traffic
-            "udp",  # UDP traffic
-            "icmp", # ICMP traffic
-            "arp"   # ARP traffic
-        ]
+        # Suspicious-only capture keeps uninteresting traffic in the kernel
+        return SUSPICIOUS_FILTER if self.suspicious_only else ALL_FILTER
+    
+    def _enqueue(self, frame: bytes, ts_ns: int, wire_len: int, interface: str):
+        """Queue a captured frame for the consumer, dropping the oldest when full"""
+        if len(self._queue) == self._queue.maxlen:
+            self.stats['packets_dropped'] += 1
+        self._queue.append((frame, ts_ns, wire_len, interface))
+    
+    def _enqueue_threadsafe(self, frame: bytes, ts_ns: int, wire_len: int, interface: str):
+        """Queue a frame from a capture thread and wake the consumer if idle"""
+        self._enqueue(frame, ts_ns, wire_len, interface)
+        if not self._wake.is_set():
+            self._loop.call_soon_threadsafe(self._wake.set)
+    
+    def _enqueue_batch_threadsafe(self, batch: List[CapturedFrame], interface: str):
+        """Queue a batch forwarded by fanout workers from the reader thread and wake the consumer if idle
         
-        return " or ".join(filters)
+        Batches go straight into the bounded queue, so a lagging loop drops frames
+        instead of accumulating pending callbacks.
+        """
+        for frame, ts_ns, wire_len in batch:
+            self._enqueue(frame, ts_ns, wire_len, interface)
+        if not self._wake.is_set():
+            self._loop.call_soon_threadsafe(self._wake.set)
     
-    async def _process_packet(self, packet: Packet, interface: str):
-        """Process captured packet"""
-        try:
-            # Extract packet information
-            packet_data = self._extract_packet_data(packet, interface)
+    def _count_dropped(self, count: int):
+        """Add frames dropped before reaching the queue to the drop statistics"""
+        self.stats['packets_dropped'] += count
+    
+    async def _consume_packets(self):
+        """Drain queued frames in batches and dispatch them to callbacks"""
+        queue = self._queue
+        
+        while self.running:
+            await self._wake.wait()
+            self._wake.clear()
             
-            if packet_data:
-                # Update statistics
-                self.stats['packets_captured'] += 1
+            while queue:
+                entries = [queue.popleft() for _ in range(min(len(queue), DISPATCH_BATCH_SIZE))]
+                batch = self._process_batch(entries)
                 
-                # Check for suspicious patterns
-                await self._analyze_packet_for_threats(packet_data)
-                
-                # Notify callbacks
-                for callback in self._packet_callbacks:
-                    try:
-                        await callback(packet_data)
-                    except Exception as e:
-                        logger.error(f"Error in packet callback: {e}")
-        
-        except Exception as e:
-            logger.error(f"Error processing packet: {e}")
+                if batch:
+                    # Notify callbacks
+                    await self._dispatch_packets(batch)
     
-    def _extract_packet_data(self, packet: Packet, interface: str) -> Optional[NetworkPacket]:
-        """Extract relevant data from packet"""
+    def _process_batch(self, entries: List[tuple]) -> List[NetworkPacket]:
+        """Process a batch of captured frames, returning packets when callbacks consume them"""
         try:
-            if not packet.haslayer(IP):
-                return None
+            # Parse header fields straight from the raw frames
+            headers = []
+            parsed = []
+            for entry in entries:
+                header = parse_frame(entry[0])
+                if header:
+                    headers.append(header)
+                    parsed.append(entry)
             
-            ip_layer = packet[IP]
-            src_ip = ip_layer.src
-            dst_ip = ip_layer.dst
-            protocol = ip_layer.proto
+            if not headers:
+                return []
             
-            src_port = None
-            dst_port = None
-            flags = {}
+            # Update statistics
+            self.stats['packets_captured'] += len(headers)
             
-            # Extract transport layer information
-            if packet.haslayer(TCP):
-                tcp_layer = packet[TCP]
-                src_port = tcp_layer.sport
-                dst_port = tcp_layer.dport
-                protocol_name = "TCP"
-                
-                # Extract TCP flags
-                flags.update({
-                    'syn': bool(tcp_layer.flags.S),
-                    'ack': bool(tcp_layer.flags.A),
-                    'fin': bool(tcp_layer.flags.F),
-                    'rst': bool(tcp_layer.flags.R),
-                    'psh': bool(tcp_layer.flags.P),
-                    'urg': bool(tcp_layer.flags.U)
-                })
-                
-            elif packet.haslayer(UDP):
-                udp_layer = packet[UDP]
-                src_port = udp_layer.sport
-                dst_port = udp_layer.dport
-                protocol_name = "UDP"
-                
-            elif packet.haslayer(ICMP):
-                protocol_name = "ICMP"
-                flags['type'] = packet[ICMP].type
-                flags['code'] = packet[ICMP].code
-                
-            elif packet.haslayer(ARP):
-                protocol_name = "ARP"
-                flags['op'] = packet[ARP].op
-                
-            else:
-                protocol_name = f"IP-{protocol}"
-            
-            # Extract payload preview (first 100 bytes)
-            payload_preview = ""
-            if hasattr(packet, 'payload'):
-                raw_payload = bytes(packet.payload)[:100]
-                payload_preview = raw_payload.hex()
-            
-            return NetworkPacket(
-                timestamp=datetime.utcnow(),
-                src_ip=src_ip,
-                dst_ip=dst_ip,
-                src_port=src_port,
-                dst_port=dst_port,
-                protocol=protocol_name,
-                size=len(packet),
-                flags=flags,
-                payload_preview=payload_preview
-            )
+            # Check for suspicious patterns
+            self._analyze_packets_for_threats(headers)
             
+            # Only materialize packets when a callback consumes them
+            if self._packet_callbacks:
+                return [
+                    self._extract_packet_data(frame, header, ts_ns, wire_len, interface)
+                    for (frame, ts_ns, wire_len, interface), header in zip(parsed, headers)
+                ]
+        
         except Exception as e:
-            logger.error(f"Error extracting packet data: {e}")
-            return None
+            logger.error(f"Error processing packet batch: {e}")
+        
+        return []
     
-    async def _analyze_packet_for_threats(self, packet_data: NetworkPacket):
-        """Analyze packet for potential threats"""
-        suspicious = False
+    def _extract_packet_data(self, frame: bytes, header: ParsedHeader, ts_ns: int, wire_len: int,
+                             interface: str) -> NetworkPacket:
+        """Build a packet record from parsed header fields"""
+        src_ip, dst_ip, src_port, dst_port, protocol, raw_flags = header
         
-        # Check for port scanning
-        if packet_data.protocol == "TCP" and packet_data.flags.get('syn') and not packet_data.flags.get('ack'):
-            # Potential SYN scan
-            suspicious = True
+        if protocol == PROTO_TCP:
+            protocol_name = "TCP"
+        elif protocol == PROTO_UDP:
+            protocol_name = "UDP"
+        elif protocol == PROTO_ICMP:
+            protocol_name = "ICMP"
+        else:
+            protocol_name = f"IP-{protocol}"
         
-        # Check for unusual port numbers
-        if packet_data.dst_port and packet_data.dst_port > 65000:
-            suspicious = True
+        # Payload head (first 100 bytes after the Ethernet header), hex-encoded on demand
+        payload_head = frame[ETH_HEADER_LEN:ETH_HEADER_LEN + 100] if self.payload_preview else b''
         
-        # Check for ARP spoofing attempts
-        if packet_data.protocol == "ARP":
-            suspicious = True
+        return NetworkPacket(
+            ts_ns=ts_ns,
+            src_addr=src_ip,
+            dst_addr=dst_ip,
+            src_port=src_port or None,
+            dst_port=dst_port or None,
+            protocol=protocol_name,
+            size=wire_len,
+            tcp_flags=raw_flags,
+            payload_head=payload_head
+        )
+    
+    def _analyze_packets_for_threats(self, headers: List[ParsedHeader]):
+        """Analyze a batch of packets for potential threats"""
+        suspicious = self._suspicious[:len(headers)]
+        _classify_headers(np.array(headers, dtype=np.int64), suspicious)
         
-        if suspicious:
-            self.stats['suspicious_activities'] += 1
-            logger.warning(f"Suspicious packet detected: {packet_data.src_ip} -> {packet_data.dst_ip}:{packet_data.dst_port}")
+        count = int(suspicious.sum())
+        if count:
+            self.stats['suspicious_activities'] += count
+            for i in np.flatnonzero(suspicious):
+                src_ip, dst_ip, _, dst_port, _, _ = headers[i]
+                logger.warning(f"Suspicious packet detected: {_format_ip(src_ip)} -> {_format_ip(dst_ip)}:{dst_port or None}")
     
     async def _track_connections(self):
         """Track network connections using system information"""
+        use_proc = proc_net.available()
+        
         while self.running:
             try:
-                # Get current connections
-                connections = psutil.net_connections(kind='inet')
-                
-                for conn in connections:
-                    if conn.status == 'ESTABLISHED':
-                        await self._process_connection(conn)
+                if use_proc:
+                    await self._poll_socket_table()
+                else:
+                    # Get current connections
+                    connections = psutil.net_connections(kind='inet')
+                    
+                    for conn in connections:
+                        if conn.status == 'ESTABLISHED':
+                            await self._process_connection(conn)
                 
                 await asyncio.sleep(5)  # Check every 5 seconds
                 
@@ -273,22 +507,47 @@ class NetworkMonitor:
                 logger.error(f"Error tracking connections: {e}")
                 await asyncio.sleep(10)
     
+    async def _poll_socket_table(self):
+        """Process only the sockets that appeared since the previous poll"""
+        sockets = proc_net.read_established_tcp()
+        new_inodes = sockets.keys() - self._socket_keys.keys()
+        
+        # Owners are only looked up for new sockets
+        pids = proc_net.resolve_socket_pids(new_inodes)
+        
+        for inode in new_inodes:
+            connection = proc_net.make_connection(*sockets[inode], pids.get(inode))
+            await self._process_connection(connection)
+            self._socket_keys[inode] = _connection_key(connection)
+        
+        # Forget closed sockets and mark the open ones as seen
+        self._socket_keys = {inode: key for inode, key in self._socket_keys.items() if inode in sockets}
+        for key in self._socket_keys.values():
+            state = self.connection_tracker.get(key)
+            if state is not None:
+                state.ref_bits = CONNECTION_REF_BITS
+    
     async def _process_connection(self, connection):
         """Process a network connection"""
         try:
             if not connection.laddr or not connection.raddr:
                 return
             
-            connection_key = f"{connection.laddr.ip}:{connection.laddr.port}-{connection.raddr.ip}:{connection.raddr.port}"
+            connection_key = _connection_key(connection)
+            state = self.connection_tracker.get(connection_key)
             
-            if connection_key not in self.connection_tracker:
+            if state is not None:
+                # Still alive, give it another chance at the next sweep
+                state.ref_bits = CONNECTION_REF_BITS
+            else:
                 # New connection
-                self.connection_tracker[connection_key] = {
-                    'start_time': datetime.utcnow(),
-                    'bytes_sent': 0,
-                    'bytes_received': 0,
-                    'pid': connection.pid
-                }
+                self.connection_tracker[connection_key] = ConnectionState(
+                    start_time=datetime.utcnow(),
+                    bytes_sent=0,
+                    bytes_received=0,
+                    pid=connection.pid,
+                    ref_bits=CONNECTION_REF_BITS
+                )
                 
                 self.stats['connections_tracked'] += 1
                 
@@ -306,32 +565,51 @@ class NetworkMonitor:
                 )
                 
                 # Notify callbacks
-                for callback in self._connection_callbacks:
-                    try:
-                        await callback(conn_event)
-                    except Exception as e:
-                        logger.error(f"Error in connection callback: {e}")
+                await self._dispatch_connection(conn_event)
         
         except Exception as e:
             logger.error(f"Error processing connection: {e}")
     
+    async def _collect_connections(self):
+        """Periodically evict connections that have not been seen recently"""
+        while self.running:
+            await asyncio.sleep(CONNECTION_GC_INTERVAL)
+            
+            try:
+                dead = []
+                for key, state in self.connection_tracker.items():
+                    state.ref_bits >>= 1
+                    if not state.ref_bits:
+                        dead.append(key)
+                
+                for key in dead:
+                    del self.connection_tracker[key]
+                
+                if dead:
+                    logger.debug(f"Evicted {len(dead)} stale connections")
+                
+            except Exception as e:
+                logger.error(f"Error collecting connections: {e}")
+    
     async def _report_statistics(self):
         """Periodically report monitoring statistics"""
         while self.running:
             try:
-                logger.info(f"Network monitoring stats: {json.dumps(self.stats, indent=2)}")
+                logger.info(STATS_FORMAT.format_map(self.stats))
                 await asyncio.sleep(60)  # Report every minute
             except Exception as e:
                 logger.error(f"Error reporting statistics: {e}")
                 await asyncio.sleep(60)
     
     def on_packet_captured(self, callback: Callable):
-        """Register callback for packet capture events"""
+        """Register callback for batches of captured packets (List[NetworkPacket])"""
         self._packet_callbacks.append(callback)
+        self._dispatch_packets = _fuse_callbacks(self._packet_callbacks, 'packet')
     
     def on_connection_event(self, callback: Callable):
         """Register callback for connection events"""
         self._connection_callbacks.append(callback)
+        self._dispatch_connection = _fuse_callbacks(self._connection_callbacks, 'connection')
     
     async def health_check(self):
         """Health check for network monitor"""
@@ -4,8 +4,13 @@ Provides a testing environment for security researchers and red teams
 """
 
 import asyncio
-import docker
-from typing import Dict, Any, List, Optional
+import functools
+import hashlib
+import heapq
+import uuid
+from collections import Counter
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import json
@@ -17,6 +22,48 @@ from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Docker image for each sandbox service
+_SERVICE_IMAGES: Mapping[str, str] = MappingProxyType({
+    'web': 'nginx:alpine',
+    'ssh': 'linuxserver/openssh-server',
+    'ftp': 'stilliard/pure-ftpd',
+    'database': 'mysql:8.0',
+    'file_server': 'dperson/samba',
+    'email': 'mailserver/docker-mailserver',
+    'api': 'node:alpine',
+    'storage': 'minio/minio',
+    'telnet': 'alpine:latest',
+    'mqtt': 'eclipse-mosquitto',
+    'upnp': 'alpine:latest'
+})
+
+# Available environments, shared by every emulator and read-only all the way down
+_ENVIRONMENTS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    'basic_network': MappingProxyType({
+        'description': 'Basic network environment with vulnerable services',
+        'services': ('web', 'ssh', 'ftp'),
+        'network_size': 24
+    }),
+    'corporate_sim': MappingProxyType({
+        'description': 'Simulated corporate network environment',
+        'services': ('web', 'ssh', 'database', 'file_server', 'email'),
+        'network_size': 16
+    }),
+    'iot_environment': MappingProxyType({
+        'description': 'IoT device simulation environment',
+        'services': ('http', 'telnet', 'upnp', 'mqtt'),
+        'network_size': 28
+    }),
+    'cloud_infrastructure': MappingProxyType({
+        'description': 'Cloud infrastructure simulation',
+        'services': ('web', 'api', 'database', 'storage'),
+        'network_size': 20
+    })
+})
+
+# Subnet indices handed out to sessions (172.X.0.0 / 192.168.X.0)
+SUBNET_POOL = range(1, 255)
+
 @dataclass
 class SandboxSession:
     """Sandbox session information"""
@@ -28,39 +75,30 @@ class SandboxSession:
     expires_at: datetime
     resources: Dict[str, Any]
     access_info: Dict[str, Any]
+    subnet_idx: int
 
 class SandboxEmulator:
     """Security testing sandbox environment"""
     
+    # Shared, read-only environment definitions
+    environments = _ENVIRONMENTS
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.sessions: Dict[str, SandboxSession] = {}
+        
+        # Indexes over the hot session fields, maintained on create/destroy
+        self._expiry: List[Tuple[datetime, str]] = []
+        self._expiry_wake: Optional[asyncio.Event] = None
+        self._by_user: Dict[str, Set[str]] = {}
+        self._status_counts: Counter = Counter()
+        self._env_counts: Counter = Counter()
         self.docker_client = None
         self.running = False
         
-        # Available environments
-        self.environments = {
-            'basic_network': {
-                'description': 'Basic network environment with vulnerable services',
-                'services': ['web', 'ssh', 'ftp'],
-                'network_size': 24
-            },
-            'corporate_sim': {
-                'description': 'Simulated corporate network environment',
-                'services': ['web', 'ssh', 'database', 'file_server', 'email'],
-                'network_size': 16
-            },
-            'iot_environment': {
-                'description': 'IoT device simulation environment',
-                'services': ['http', 'telnet', 'upnp', 'mqtt'],
-                'network_size': 28
-            },
-            'cloud_infrastructure': {
-                'description': 'Cloud infrastructure simulation',
-                'services': ['web', 'api', 'database', 'storage'],
-                'network_size': 20
-            }
-        }
+        # Subnet allocation, keyed so assignments are stable across restarts
+        self._subnet_key = config.get('subnet_key', 'shadowwall-sandbox').encode()[:64]
+        self._free_subnets = set(SUBNET_POOL)
     
     async def start(self):
         """Start the sandbox emulator"""
@@ -71,6 +109,9 @@ class SandboxEmulator:
             return
         
         try:
+            # Imported here so simulation-mode use never loads the docker SDK
+            import docker
+            
             # Initialize Docker client
             self.docker_client = docker.from_env()
             
@@ -78,9 +119,11 @@ class SandboxEmulator:
             self.docker_client.ping()
             
             self.running = True
+            self._expiry_wake = asyncio.Event()
             
             # Start background tasks
             asyncio.create_task(self._cleanup_expired_sessions())
+            asyncio.create_task(self._prewarm_images())
             
             logger.info("Sandbox emulator started successfully")
             
@@ -94,6 +137,8 @@ class SandboxEmulator:
         logger.info("Stopping sandbox emulator...")
         
         self.running = False
+        if self._expiry_wake:
+            self._expiry_wake.set()
         
         # Stop all active sessions
         for session_id in list(self.sessions.keys()):
@@ -104,12 +149,33 @@ class SandboxEmulator:
         
         logger.info("Sandbox emulator stopped")
     
+    async def _prewarm_images(self):
+        """Pull every service image up front so first sessions do not wait on pulls"""
+        loop = asyncio.get_running_loop()
+        images = sorted({
+            _SERVICE_IMAGES[service]
+            for environment in self.environments.values()
+            for service in environment['services']
+            if service in _SERVICE_IMAGES
+        })
+        
+        results = await asyncio.gather(
+            *[loop.run_in_executor(None, self.docker_client.images.pull, image) for image in images],
+            return_exceptions=True
+        )
+        
+        for image, result in zip(images, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to pull sandbox image {image}: {result}")
+        
+        logger.info(f"Prefetched {sum(not isinstance(r, Exception) for r in results)}/{len(images)} sandbox images")
+    
     async def create_session(self, user_id: str, environment_type: str, 
                            duration_minutes: int = 60) -> Optional[str]:
         """Create a new sandbox session"""
         try:
             # Check session limits
-            active_sessions = sum(1 for s in self.sessions.values() if s.status == 'active')
+            active_sessions = self._status_counts['active']
             if active_sessions >= self.config['max_concurrent_sessions']:
                 logger.warning(f"Maximum concurrent sessions reached: {active_sessions}")
                 return None
@@ -119,8 +185,18 @@ class SandboxEmulator:
                 logger.error(f"Unknown environment type: {environment_type}")
                 return None
             
-            # Generate session ID
-            session_id = f"sandbox_{user_id}_{int(datetime.utcnow().timestamp())}"
+            # Generate session ID; the random suffix keeps a user's sessions created
+            # within the same second apart
+            session_id = f"sandbox_{user_id}_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
+            if session_id in self.sessions:
+                logger.error(f"Sandbox session {session_id} already exists")
+                return None
+            
+            # Reserve a subnet only once the ID is known to be unique
+            subnet_idx = self._allocate_subnet(session_id)
+            if subnet_idx is None:
+                logger.warning("No free sandbox subnets available")
+                return None
             
             # Calculate expiry time
             expires_at = datetime.utcnow() + timedelta(minutes=duration_minutes)
@@ -134,27 +210,89 @@ class SandboxEmulator:
                 created_at=datetime.utcnow(),
                 expires_at=expires_at,
                 resources={},
-                access_info={}
+                access_info={},
+                subnet_idx=subnet_idx
             )
             
-            self.sessions[session_id] = session
+            self._add_session(session)
             
             # Deploy the environment
             success = await self._deploy_environment(session)
             
             if success:
-                session.status = 'active'
+                self._set_status(session, 'active')
                 logger.info(f"Created sandbox session {session_id} for user {user_id}")
                 return session_id
             else:
                 # Clean up failed session
-                del self.sessions[session_id]
+                self._remove_session(session)
                 return None
                 
         except Exception as e:
             logger.error(f"Error creating sandbox session: {e}")
             return None
     
+    def _add_session(self, session: SandboxSession):
+        """Register a session and index its hot fields
+        
+        A session already registered under the same ID is unregistered first,
+        so its subnet and index counts are not leaked.
+        """
+        previous = self.sessions.get(session.session_id)
+        if previous is not None:
+            self._remove_session(previous)
+        self.sessions[session.session_id] = session
+        heapq.heappush(self._expiry, (session.expires_at, session.session_id))
+        
+        # Reschedule the cleanup task if this is now the earliest expiry
+        if self._expiry_wake and self._expiry[0][1] == session.session_id:
+            self._expiry_wake.set()
+        self._by_user.setdefault(session.user_id, set()).add(session.session_id)
+        self._status_counts[session.status] += 1
+        self._env_counts[session.environment_type] += 1
+    
+    def _remove_session(self, session: SandboxSession):
+        """Unregister a session, its indexes and its subnet
+        
+        Expiry entries are dropped lazily when they reach the top of the heap.
+        """
+        del self.sessions[session.session_id]
+        
+        user_sessions = self._by_user[session.user_id]
+        user_sessions.discard(session.session_id)
+        if not user_sessions:
+            del self._by_user[session.user_id]
+        
+        self._status_counts[session.status] -= 1
+        self._env_counts[session.environment_type] -= 1
+        self._release_subnet(session.subnet_idx)
+    
+    def _set_status(self, session: SandboxSession, status: str):
+        """Change a session's status, keeping the status counts in step"""
+        self._status_counts[session.status] -= 1
+        self._status_counts[status] += 1
+        session.status = status
+    
+    def _allocate_subnet(self, session_id: str) -> Optional[int]:
+        """Reserve a subnet index for a session, probing from its keyed hash"""
+        if not self._free_subnets:
+            return None
+        
+        digest = hashlib.blake2b(session_id.encode(), digest_size=8, key=self._subnet_key).digest()
+        start = int.from_bytes(digest, 'little') % len(SUBNET_POOL)
+        
+        for offset in range(len(SUBNET_POOL)):
+            subnet_idx = SUBNET_POOL[(start + offset) % len(SUBNET_POOL)]
+            if subnet_idx in self._free_subnets:
+                self._free_subnets.remove(subnet_idx)
+                return subnet_idx
+        
+        return None
+    
+    def _release_subnet(self, subnet_idx: int):
+        """Return a session's subnet index to the pool"""
+        self._free_subnets.add(subnet_idx)
+    
     async def _deploy_environment(self, session: SandboxSession) -> bool:
         """Deploy the sandbox environment"""
         try:
@@ -172,48 +310,53 @@ class SandboxEmulator:
             return False
     
     async def _deploy_docker_environment(self, session: SandboxSession, 
-                                       environment: Dict[str, Any]) -> bool:
+                                       environment: Mapping[str, Any]) -> bool:
         """Deploy environment using Docker containers"""
         try:
-            containers = []
+            loop = asyncio.get_running_loop()
             network_name = f"sandbox_{session.session_id}"
             
             # Create dedicated network
-            network = self.docker_client.networks.create(
+            network = await loop.run_in_executor(None, functools.partial(
+                self.docker_client.networks.create,
                 network_name,
                 driver="bridge",
                 options={"com.docker.network.bridge.name": network_name}
-            )
+            ))
             
-            # Deploy service containers
+            # Deploy service containers concurrently, one daemon round-trip each
+            runs = []
             for service in environment['services']:
-                container_name = f"{session.session_id}_{service}"
                 image = self._get_service_image(service)
                 
                 if image:
-                    container = self.docker_client.containers.run(
+                    runs.append(loop.run_in_executor(None, functools.partial(
+                        self.docker_client.containers.run,
                         image,
-                        name=container_name,
+                        name=f"{session.session_id}_{service}",
                         network=network_name,
                         detach=True,
                         remove=True,
                         environment={"SANDBOX_SESSION": session.session_id}
-                    )
-                    containers.append(container)
+                    )))
+            
+            containers = await asyncio.gather(*runs)
             
             # Store deployment information
             session.resources = {
                 'network': network_name,
                 'containers': [c.name for c in containers],
-                'services': environment['services']
+                'services': list(environment['services'])
             }
             
             # Generate access information
+            subnet_idx = session.subnet_idx
+            services = environment['services']
             session.access_info = {
-                'network_range': f"172.{hash(session.session_id) % 255}.0.0/{environment['network_size']}",
+                'network_range': f"172.{subnet_idx}.0.0/{environment['network_size']}",
                 'services': {
                     service: f"{service}.{network_name}" 
-                    for service in environment['services']
+                    for service in services
                 },
                 'access_methods': ['docker exec', 'network tools'],
                 'documentation': f"Sandbox environment: {environment['description']}"
@@ -226,25 +369,29 @@ class SandboxEmulator:
             return False
     
     async def _simulate_environment_deployment(self, session: SandboxSession, 
-                                             environment: Dict[str, Any]) -> bool:
+                                             environment: Mapping[str, Any]) -> bool:
         """Simulate environment deployment (when Docker is not available)"""
         try:
             # Simulate deployment delay
             await asyncio.sleep(2)
             
+            services = environment['services']
+            network_size = environment['network_size']
+            
             # Generate simulated resources
             session.resources = {
                 'simulation': True,
-                'services': environment['services'],
-                'network_size': environment['network_size']
+                'services': list(services),
+                'network_size': network_size
             }
             
             # Generate simulated access information
+            subnet_idx = session.subnet_idx
             session.access_info = {
-                'network_range': f"192.168.{hash(session.session_id) % 255}.0/{environment['network_size']}",
+                'network_range': f"192.168.{subnet_idx}.0/{network_size}",
                 'services': {
-                    service: f"192.168.{hash(session.session_id) % 255}.{i+10}"
-                    for i, service in enumerate(environment['services'])
+                    service: f"192.168.{subnet_idx}.{i+10}"
+                    for i, service in enumerate(services)
                 },
                 'access_methods': ['simulated'],
                 'documentation': f"Simulated sandbox: {environment['description']}",
@@ -260,28 +407,15 @@ class SandboxEmulator:
     
     def _get_service_image(self, service: str) -> Optional[str]:
         """Get Docker image for a service"""
-        service_images = {
-            'web': 'nginx:alpine',
-            'ssh': 'linuxserver/openssh-server',
-            'ftp': 'stilliard/pure-ftpd',
-            'database': 'mysql:8.0',
-            'file_server': 'dperson/samba',
-            'email': 'mailserver/docker-mailserver',
-            'api': 'node:alpine',
-            'storage': 'minio/minio',
-            'telnet': 'alpine:latest',
-            'mqtt': 'eclipse-mosquitto',
-            'upnp': 'alpine:latest'
-        }
-        
-        return service_images.get(service)
+        return _SERVICE_IMAGES.get(service)
     
     async def get_session_info(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get information about a sandbox session"""
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             return None
         
-        session = self.sessions[session_id]
+        environment = self.environments[session.environment_type]
         
         # Calculate remaining time
         remaining_time = (session.expires_at - datetime.utcnow()).total_seconds()
@@ -296,7 +430,7 @@ class SandboxEmulator:
             'remaining_time_minutes': max(0, remaining_time / 60),
             'resources': session.resources,
             'access_info': session.access_info,
-            'environment_description': self.environments[session.environment_type]['description']
+            'environment_description': environment['description']
         }
     
     async def destroy_session(self, session_id: str) -> bool:
@@ -312,7 +446,7 @@ class SandboxEmulator:
                 await self._cleanup_docker_resources(session)
             
             # Remove session
-            del self.sessions[session_id]
+            self._remove_session(session)
             
             logger.info(f"Destroyed sandbox session {session_id}")
             return True
@@ -323,6 +457,8 @@ class SandboxEmulator:
     
     async def _cleanup_docker_resources(self, session: SandboxSession):
         """Clean up Docker resources for a session"""
+        from docker.errors import NotFound
+        
         try:
             resources = session.resources
             
@@ -333,7 +469,7 @@ class SandboxEmulator:
                         container = self.docker_client.containers.get(container_name)
                         container.stop(timeout=10)
                         container.remove()
-                    except docker.errors.NotFound:
+                    except NotFound:
                         pass  # Container already removed
                     except Exception as e:
                         logger.warning(f"Error removing container {container_name}: {e}")
@@ -343,7 +479,7 @@ class SandboxEmulator:
                 try:
                     network = self.docker_client.networks.get(resources['network'])
                     network.remove()
-                except docker.errors.NotFound:
+                except NotFound:
                     pass  # Network already removed
                 except Exception as e:
                     logger.warning(f"Error removing network {resources['network']}: {e}")
@@ -355,13 +491,25 @@ class SandboxEmulator:
         """Clean up expired sandbox sessions"""
         while self.running:
             try:
-                await asyncio.sleep(300)  # Check every 5 minutes
+                # Sleep until the earliest expiry, or until an earlier one is added
+                delay = None
+                if self._expiry:
+                    delay = max(0.0, (self._expiry[0][0] - datetime.utcnow()).total_seconds())
+                
+                try:
+                    await asyncio.wait_for(self._expiry_wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._expiry_wake.clear()
                 
                 current_time = datetime.utcnow()
                 expired_sessions = []
                 
-                for session_id, session in self.sessions.items():
-                    if current_time > session.expires_at:
+                # Pop due expiries; skip entries for sessions already destroyed
+                while self._expiry and self._expiry[0][0] <= current_time:
+                    expires_at, session_id = heapq.heappop(self._expiry)
+                    session = self.sessions.get(session_id)
+                    if session is not None and session.expires_at == expires_at:
                         expired_sessions.append(session_id)
                 
                 # Clean up expired sessions
@@ -375,32 +523,31 @@ class SandboxEmulator:
     async def list_sessions(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """List sandbox sessions"""
         sessions = []
+        session_ids = self.sessions.keys() if user_id is None else self._by_user.get(user_id, ())
         
-        for session in self.sessions.values():
-            if user_id is None or session.user_id == user_id:
-                session_info = await self.get_session_info(session.session_id)
-                if session_info:
-                    sessions.append(session_info)
+        for session_id in list(session_ids):
+            session_info = await self.get_session_info(session_id)
+            if session_info:
+                sessions.append(session_info)
         
         return sessions
     
     def get_available_environments(self) -> Dict[str, Any]:
         """Get list of available sandbox environments"""
-        return self.environments.copy()
+        # Plain copies, so callers can edit them without touching the shared definitions
+        return {
+            name: dict(environment, services=list(environment['services']))
+            for name, environment in self.environments.items()
+        }
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get sandbox usage statistics"""
-        active_sessions = sum(1 for s in self.sessions.values() if s.status == 'active')
-        
         # Environment usage
-        env_usage = {}
-        for session in self.sessions.values():
-            env_type = session.environment_type
-            env_usage[env_type] = env_usage.get(env_type, 0) + 1
+        env_usage = {env_type: count for env_type, count in self._env_counts.items() if count}
         
         return {
             'total_sessions': len(self.sessions),
-            'active_sessions': active_sessions,
+            'active_sessions': self._status_counts['active'],
             'max_sessions': self.config['max_concurrent_sessions'],
             'environment_usage': env_usage,
             'docker_available': self.docker_client is not None,
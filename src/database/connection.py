@@ -5,28 +5,107 @@ Handles SQLAlchemy setup and database operations
 
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, insert, select, MetaData, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+try:
+    import orjson
+    
+    def _json_serializer(value) -> str:
+        return orjson.dumps(value).decode()
+except ImportError:
+    # Fallback for environments without orjson
+    import json
+    _json_serializer = json.dumps
 
 from ..utils.logger import get_logger
+from .writer import EventWriter, execute_insert
 
 logger = get_logger(__name__)
 
-# Base class for SQLAlchemy models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """Base class for SQLAlchemy models"""
+
+# Hot lookup entities loaded in the current session scope, keyed by (model, lookup key)
+_entity_cache: ContextVar[Optional[Dict[Any, Any]]] = ContextVar("_entity_cache", default=None)
+
+def invalidate_cached_entity(mapper, connection, target):
+    """Mapper event hook dropping an updated or deleted row from the session-scoped cache"""
+    cache = _entity_cache.get()
+    if cache:
+        for key in [key for key, entity in cache.items() if entity is target]:
+            del cache[key]
+
+# Liveness probe, built once and reused by every health check
+_HEALTH_STMT = text("SELECT 1")
+
+# Read-only sessions skip the BEGIN/COMMIT roundtrips
+_AUTOCOMMIT_OPTIONS = {"isolation_level": "AUTOCOMMIT"}
+
+# Compiled statement cache entries per engine (SQLAlchemy defaults to 500)
+QUERY_CACHE_SIZE = 2000
+
+# Seconds a checkout waits for a free pooled connection before failing
+POOL_TIMEOUT = 30
+
+# Rows per multi-VALUES INSERT when executing many parameter sets
+INSERT_PAGE_SIZE = 1000
+
+# Batches at least this large are streamed with COPY where the driver supports it
+COPY_THRESHOLD = 10000
+
+_ASYNC_COMMIT_STMT = text("SET LOCAL synchronous_commit = OFF")
+
+# Event tables range-partitioned by day on PostgreSQL
+PARTITIONED_TABLES = ("network_events", "honeypot_events")
+PARTITION_DAYS_AHEAD = 2
+PARTITION_MAINTENANCE_INTERVAL = 3600  # seconds
+
+_CHILD_PARTITIONS_STMT = text(
+    "SELECT c.relname FROM pg_inherits i "
+    "JOIN pg_class c ON c.oid = i.inhrelid "
+    "JOIN pg_class p ON p.oid = i.inhparent "
+    "WHERE p.relname = :parent"
+)
+
+_IS_PARTITIONED_STMT = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+    "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :parent)"
+)
+
+_RELATION_EXISTS_STMT = text("SELECT to_regclass(:name) IS NOT NULL")
 
 class DatabaseManager:
     """Database connection and session management"""
     
-    def __init__(self, database_url: str, echo: bool = False):
+    def __init__(self, database_url: str, echo: bool = False, pool_size: int = 20,
+                 max_overflow: int = 40, pool_recycle: int = 1800, pool_pre_ping: bool = True,
+                 prewarm: bool = True, retention_days: int = 30, write_batch_size: int = 500,
+                 write_flush_interval: float = 0.1, sync_enabled: bool = False):
         self.database_url = database_url
         self.echo = echo
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.prewarm = prewarm
+        self.retention_days = retention_days
+        self.partitioned = database_url.startswith('postgresql')
+        self._partition_task = None
+        self.lookup_ids: Dict[str, Dict[str, int]] = {}  # lookup table -> name -> id
+        self.write_batch_size = write_batch_size
+        self.write_flush_interval = write_flush_interval
+        self.writer = None
+        self.sync_enabled = sync_enabled
+        self._pool_options: Dict[str, Any] = {}
         self.engine = None
         self.async_engine = None
         self.SessionLocal = None
@@ -35,44 +114,55 @@ class DatabaseManager:
     async def initialize(self):
         """Initialize database connections and create tables"""
         try:
-            # Create synchronous engine
             if self.database_url.startswith('sqlite'):
-                # Special handling for SQLite
-                self.engine = create_engine(
-                    self.database_url,
-                    echo=self.echo,
-                    poolclass=StaticPool,
-                    connect_args={"check_same_thread": False}
-                )
-                
                 # For async SQLite
                 async_url = self.database_url.replace('sqlite://', 'sqlite+aiosqlite://')
                 self.async_engine = create_async_engine(
                     async_url,
                     echo=self.echo,
-                    poolclass=StaticPool
+                    poolclass=StaticPool,
+                    query_cache_size=QUERY_CACHE_SIZE,
+                    json_serializer=_json_serializer
                 )
             else:
                 # PostgreSQL, MySQL, etc.
-                self.engine = create_engine(self.database_url, echo=self.echo)
+                self._pool_options = pool_options = {
+                    'pool_size': self.pool_size,
+                    'max_overflow': self.max_overflow,
+                    'pool_recycle': self.pool_recycle,
+                    'pool_pre_ping': self.pool_pre_ping,
+                    'pool_timeout': POOL_TIMEOUT,
+                    'insertmanyvalues_page_size': INSERT_PAGE_SIZE
+                }
                 
                 # Convert to async URL
+                connect_args = {}
                 if 'postgresql://' in self.database_url:
                     async_url = self.database_url.replace('postgresql://', 'postgresql+asyncpg://')
+                    connect_args = {
+                        'command_timeout': 60,
+                        'server_settings': {'application_name': 'shadowwall'}
+                    }
                 elif 'mysql://' in self.database_url:
                     async_url = self.database_url.replace('mysql://', 'mysql+aiomysql://')
                 else:
                     async_url = self.database_url
                 
-                self.async_engine = create_async_engine(async_url, echo=self.echo)
+                self.async_engine = create_async_engine(
+                    async_url,
+                    echo=self.echo,
+                    connect_args=connect_args,
+                    query_cache_size=QUERY_CACHE_SIZE,
+                    json_serializer=_json_serializer,
+                    poolclass=AsyncAdaptedQueuePool,  # asyncio-aware queue; burst writes share pool_size + max_overflow
+                    **pool_options
+                )
             
-            # Create session factories
-            self.SessionLocal = sessionmaker(
-                autocommit=False,
-                autoflush=False,
-                bind=self.engine
-            )
+            # The sync engine holds its own pool, so it is only opened when something needs it
+            if self.sync_enabled:
+                self._create_sync_engine()
             
+            # Create session factories
             self.AsyncSessionLocal = async_sessionmaker(
                 self.async_engine,
                 class_=AsyncSession,
@@ -82,12 +172,54 @@ class DatabaseManager:
             # Create tables
             await self._create_tables()
             
+            # Keep daily partitions created ahead of inserts and dropped past retention
+            if self.partitioned:
+                await self._maintain_partitions()
+                self._partition_task = asyncio.create_task(self._partition_maintenance_loop())
+            
+            # Event writes are queued and flushed as multi-row INSERTs in the background
+            self.writer = EventWriter(self, self.write_batch_size, self.write_flush_interval)
+            self.writer.start()
+            
+            # Open the pool's connections before traffic arrives (SQLite uses a single static connection)
+            if self.prewarm and not self.database_url.startswith('sqlite'):
+                await self._prewarm_pool()
+            
             logger.info("Database initialized successfully")
             
-        except Exception as e:
+        except (SQLAlchemyError, OSError, ImportError) as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
+    def _create_sync_engine(self):
+        """Create the synchronous engine and its session factory"""
+        if self.database_url.startswith('sqlite'):
+            # Special handling for SQLite
+            self.engine = create_engine(
+                self.database_url,
+                echo=self.echo,
+                poolclass=StaticPool,
+                connect_args={"check_same_thread": False},
+                json_serializer=_json_serializer
+            )
+        else:
+            # psycopg2 batches the executemany calls that are not plain INSERTs
+            sync_options = {}
+            if self.database_url.startswith('postgresql://'):
+                sync_options = {
+                    'executemany_mode': 'values_plus_batch',
+                    'executemany_batch_page_size': 500
+                }
+            
+            self.engine = create_engine(self.database_url, echo=self.echo, json_serializer=_json_serializer,
+                                        **self._pool_options, **sync_options)
+        
+        self.SessionLocal = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=self.engine
+        )
+    
     async def _create_tables(self):
         """Create database tables"""
         try:
@@ -95,44 +227,241 @@ class DatabaseManager:
             from ..models.threat_models import ThreatEvent, IOC, ThreatPattern
             from ..models.honeypot_models import HoneypotEvent, AttackerProfile
             from ..models.network_models import NetworkEvent, ConnectionEvent
+            from ..models.lookup_models import LOOKUP_SEEDS, analyst_views
             
             # Create tables asynchronously
             async with self.async_engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(self._create_views, analyst_views())
+            
+            await self._load_lookups(LOOKUP_SEEDS)
             
             logger.info("Database tables created successfully")
             
-        except Exception as e:
+        except SQLAlchemyError as e:
             logger.error(f"Failed to create database tables: {e}")
             raise
     
+    @staticmethod
+    def _create_views(conn, views: Dict[str, Any]):
+        """Create the analyst views that re-join lookup names onto event tables"""
+        create = "CREATE VIEW IF NOT EXISTS" if conn.dialect.name == 'sqlite' else "CREATE OR REPLACE VIEW"
+        for name, query in views.items():
+            compiled = query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+            conn.exec_driver_sql(f"{create} {name} AS {compiled}")
+    
+    async def _load_lookups(self, seeds: Dict[Any, tuple]):
+        """Seed the lookup tables and cache their name -> id maps"""
+        async with self.async_engine.begin() as conn:
+            for model, names in seeds.items():
+                ids = dict((await conn.execute(select(model.name, model.id))).all())
+                missing = [name for name in names if name not in ids]
+                if missing:
+                    await conn.execute(insert(model), [{"name": name} for name in missing])
+                    ids = dict((await conn.execute(select(model.name, model.id))).all())
+                self.lookup_ids[model.__tablename__] = ids
+    
+    async def lookup_id(self, model, name: str) -> int:
+        """Translate a lookup name (e.g. "tcp") to its id, adding unseen names"""
+        name = name.lower()
+        ids = self.lookup_ids.setdefault(model.__tablename__, {})
+        if name in ids:
+            return ids[name]
+        
+        async with self.async_engine.begin() as conn:
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(insert(model).values(name=name))
+            except IntegrityError:
+                pass  # Added concurrently by another writer
+            ids[name] = (await conn.execute(select(model.id).where(model.name == name))).scalar_one()
+        
+        return ids[name]
+    
+    async def _maintain_partitions(self):
+        """Create upcoming daily partitions and drop those older than the retention window"""
+        today = datetime.utcnow().date()
+        cutoff = today - timedelta(days=self.retention_days)
+        
+        async with self.async_engine.begin() as conn:
+            for table in PARTITIONED_TABLES:
+                # create_all keeps a table that predates partitioning as it is
+                if not (await conn.execute(_IS_PARTITIONED_STMT, {"parent": table})).scalar():
+                    logger.warning(f"{table} is not a partitioned table; skipping partition maintenance")
+                    continue
+                
+                # Rows outside the daily window (replayed captures, or inserts while
+                # maintenance was failing) land here instead of being rejected
+                await conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+                ))
+                
+                # Start from yesterday so late events around midnight still have a home
+                for offset in range(-1, PARTITION_DAYS_AHEAD + 1):
+                    await self._create_day_partition(conn, table, today + timedelta(days=offset))
+                
+                # Retention is a metadata-only DROP instead of a DELETE over the heap
+                children = (await conn.execute(_CHILD_PARTITIONS_STMT, {"parent": table})).scalars()
+                for child in children:
+                    suffix = child[len(table) + 2:]
+                    if child.startswith(f"{table}_p") and suffix.isdigit() and len(suffix) == 8:
+                        if datetime.strptime(suffix, "%Y%m%d").date() < cutoff:
+                            await conn.execute(text(f"DROP TABLE IF EXISTS {child}"))
+                            logger.info(f"Dropped expired partition {child}")
+                
+                # The default partition only holds stragglers, so it is trimmed row by row
+                await conn.execute(
+                    text(f"DELETE FROM {table}_default WHERE timestamp < :cutoff"),
+                    {"cutoff": datetime.combine(cutoff, datetime.min.time())}
+                )
+    
+    @staticmethod
+    async def _create_day_partition(conn, table: str, day):
+        """Create a table's partition for one day, moving its rows out of the default partition"""
+        partition = f"{table}_p{day:%Y%m%d}"
+        if (await conn.execute(_RELATION_EXISTS_STMT, {"name": partition})).scalar():
+            return
+        
+        next_day = day + timedelta(days=1)
+        bounds = {"start": datetime.combine(day, datetime.min.time()),
+                  "end": datetime.combine(next_day, datetime.min.time())}
+        create = text(
+            f"CREATE TABLE {partition} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{next_day.isoformat()}')"
+        )
+        in_range = "timestamp >= :start AND timestamp < :end"
+        
+        stranded = (await conn.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_range})"), bounds
+        )).scalar()
+        if not stranded:
+            await conn.execute(create)
+            return
+        
+        # PostgreSQL refuses a new partition whose range has rows in the default one,
+        # so detach the default, create the day and move its rows across
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {table}_default"))
+        await conn.execute(create)
+        await conn.execute(text(f"INSERT INTO {partition} SELECT * FROM {table}_default WHERE {in_range}"), bounds)
+        await conn.execute(text(f"DELETE FROM {table}_default WHERE {in_range}"), bounds)
+        await conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {table}_default DEFAULT"))
+        logger.info(f"Moved rows for {day.isoformat()} from {table}_default into {partition}")
+    
+    async def _partition_maintenance_loop(self):
+        """Periodically roll the partition window forward"""
+        while True:
+            await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL)
+            try:
+                await self._maintain_partitions()
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+    
+    async def _prewarm_pool(self):
+        """Open pool_size connections concurrently and return them to the pool"""
+        connections = await asyncio.gather(*[self.async_engine.connect() for _ in range(self.pool_size)])
+        await asyncio.gather(*[conn.close() for conn in connections])
+        
+        logger.info(f"Pre-warmed database pool with {len(connections)} connections")
+    
+    async def bulk_insert(self, model, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows into a model's table as batched multi-row INSERTs"""
+        if not rows:
+            return 0
+        
+        if len(rows) >= COPY_THRESHOLD and self.async_engine.dialect.driver == 'asyncpg':
+            return await self.copy_records(model, rows)
+        
+        async with self.get_async_session() as session:
+            await execute_insert(session, model, rows)
+        
+        return len(rows)
+    
+    async def copy_records(self, model, rows: List[Dict[str, Any]], synchronous_commit: bool = True) -> int:
+        """Stream rows into a model's table with asyncpg COPY, falling back to batched INSERTs"""
+        if not rows:
+            return 0
+        
+        if self.async_engine.dialect.driver != 'asyncpg':
+            return await self.bulk_insert(model, rows)
+        
+        # Omitted columns (ids, server timestamps) take their defaults as with INSERT
+        columns = list(rows[0])
+        records = [tuple(row[column] for column in columns) for row in rows]
+        
+        async with self.async_engine.begin() as conn:
+            # Ingest-only paths can trade the fsync wait for throughput
+            if not synchronous_commit:
+                await conn.execute(_ASYNC_COMMIT_STMT)
+            
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                model.__tablename__, records=records, columns=columns
+            )
+        
+        return len(rows)
+    
+    async def get_attacker_profile(self, session: AsyncSession, source_ip: str):
+        """Look up an attacker profile, reusing it for the rest of the session scope"""
+        from ..models.honeypot_models import AttackerProfile
+        
+        return await self._cached_lookup(session, AttackerProfile, (source_ip,),
+                                         AttackerProfile.source_ip == source_ip)
+    
+    async def get_ioc(self, session: AsyncSession, ioc_type: str, value: str):
+        """Look up an IOC by type and value, reusing it for the rest of the session scope"""
+        from ..models.threat_models import IOC
+        
+        return await self._cached_lookup(session, IOC, (ioc_type, value),
+                                         IOC.ioc_type == ioc_type, IOC.value == value)
+    
+    async def _cached_lookup(self, session: AsyncSession, model, key: tuple, *criteria):
+        """Fetch one row through the session-scoped cache; misses are not cached"""
+        cache = _entity_cache.get()
+        if cache is not None and (model, key) in cache:
+            return cache[(model, key)]
+        
+        result = await session.execute(select(model).where(*criteria).limit(1))
+        entity = result.scalars().first()
+        
+        if entity is not None and cache is not None:
+            cache[(model, key)] = entity
+        return entity
+    
     @asynccontextmanager
-    async def get_async_session(self):
-        """Get async database session context manager"""
+    async def get_async_session(self, readonly: bool = False):
+        """Get async database session context manager; readonly sessions run in autocommit without BEGIN/COMMIT"""
         if not self.AsyncSessionLocal:
             raise RuntimeError("Database not initialized")
         
         session = self.AsyncSessionLocal()
+        cache_token = _entity_cache.set({})
         try:
+            if readonly:
+                await session.connection(execution_options=_AUTOCOMMIT_OPTIONS)
             yield session
-            await session.commit()
-        except Exception:
+            if not readonly:
+                await session.commit()
+        except (SQLAlchemyError, asyncio.TimeoutError):
+            # Other errors (and cancellation) are rolled back by close() below
             await session.rollback()
             raise
         finally:
+            _entity_cache.reset(cache_token)
             await session.close()
     
     @asynccontextmanager
     async def get_session(self):
         """Get sync database session context manager"""
         if not self.SessionLocal:
-            raise RuntimeError("Database not initialized")
+            if not self.AsyncSessionLocal:
+                raise RuntimeError("Database not initialized")
+            self._create_sync_engine()
         
         session = self.SessionLocal()
         try:
             yield session
             session.commit()
-        except Exception:
+        except SQLAlchemyError:
             session.rollback()
             raise
         finally:
@@ -140,6 +469,14 @@ class DatabaseManager:
     
     async def close(self):
         """Close database connections"""
+        if self.writer:
+            await self.writer.stop()
+            self.writer = None
+        
+        if self._partition_task:
+            self._partition_task.cancel()
+            self._partition_task = None
+        
         if self.async_engine:
             await self.async_engine.dispose()
         
@@ -150,10 +487,15 @@ class DatabaseManager:
     
     async def health_check(self) -> bool:
         """Check database connectivity"""
+        if not self.AsyncSessionLocal:
+            return False
+        
         try:
-            async with self.get_async_session() as session:
-                await session.execute("SELECT 1")
+            async with self.get_async_session(readonly=True) as session:
+                await session.execute(_HEALTH_STMT)
             return True
-        except Exception as e:
-            logger.error(f"Database health check failed: {e}")
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            # Connect timeouts surface as asyncio.TimeoutError, which is not an
+            # OSError before Python 3.11
+            logger.error(f"Database health check failed: {e!r}")
             return False
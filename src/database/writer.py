@@ -0,0 +1,144 @@
+"""
+Batched event writer for ShadowWall AI
+Coalesces individual event inserts into multi-row INSERTs per transaction
+"""
+
+import asyncio
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.pools import release_event_dict
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+@lru_cache(maxsize=None)
+def insert_statement(model):
+    """Core INSERT for a model's table, built once and reused by every batch"""
+    return insert(model.__table__)
+
+async def execute_insert(session: AsyncSession, model, rows: List[Dict[str, Any]]):
+    """Insert rows as Core executemany calls, one per key set, so each row shape reuses one cached INSERT"""
+    shapes: Dict[frozenset, List[Dict[str, Any]]] = {}
+    for row in rows:
+        shapes.setdefault(frozenset(row), []).append(row)
+    
+    statement = insert_statement(model)
+    for shaped_rows in shapes.values():
+        await session.execute(statement, shaped_rows)
+
+class EventWriter:
+    """Background writer that flushes queued rows every batch_size rows or flush_interval seconds"""
+    
+    def __init__(self, db_manager, batch_size: int = 500, flush_interval: float = 0.1,
+                 max_queue: int = 10000):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task = None
+        self._pending: List[tuple] = []  # rows taken off the queue but not yet flushing
+        self._inflight = None  # flush that stop() must let finish
+        self.rows_written = 0
+    
+    def start(self):
+        """Start the background flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Write everything still queued and stop the flush task"""
+        if self._task is None:
+            return
+        
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+        
+        # Write the partial batch and anything queued after it
+        pending, self._pending = self._pending, []
+        await self._flush(pending)
+        while not self._queue.empty():
+            await self._flush(self._take_batch())
+    
+    async def enqueue(self, model, row: Dict[str, Any], pooled: bool = False):
+        """Queue a row for insertion, waiting only when the queue is full
+        
+        Rows taken from acquire_event_dict() are passed with pooled=True and
+        handed back to the pool once flushed; other rows are left untouched.
+        """
+        await self._queue.put((model, row, pooled))
+    
+    def enqueue_nowait(self, model, row: Dict[str, Any], pooled: bool = False) -> bool:
+        """Queue a row without waiting; returns False if the queue is full"""
+        try:
+            self._queue.put_nowait((model, row, pooled))
+            return True
+        except asyncio.QueueFull:
+            return False
+    
+    def _take_batch(self, limit: int = 0) -> List[tuple]:
+        """Take up to limit (default batch_size) rows that are already queued"""
+        limit = limit or self.batch_size
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+    
+    async def _run(self):
+        """Collect rows until the batch is full or the flush interval elapses"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = self._pending
+            batch.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval
+            
+            while len(batch) < self.batch_size:
+                batch.extend(self._take_batch(self.batch_size - len(batch)))
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Shielded so stopping the writer never aborts a transaction midway
+            self._pending = []
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+    
+    async def _flush(self, batch: List[tuple]):
+        """Insert a batch with one multi-row INSERT per model in a single transaction"""
+        if not batch:
+            return
+        
+        rows_by_model = defaultdict(list)
+        for model, row, _ in batch:
+            rows_by_model[model].append(row)
+        
+        try:
+            async with self.db_manager.get_async_session() as session:
+                for model, rows in rows_by_model.items():
+                    await execute_insert(session, model, rows)
+            self.rows_written += len(batch)
+        except Exception as e:
+            logger.error(f"Failed to write batch of {len(batch)} events: {e}")
+        
+        # Only rows the writer owns go back to the pool
+        for _, row, pooled in batch:
+            if pooled:
+                release_event_dict(row)
@@ -0,0 +1,63 @@
+"""
+Shared column types for database models
+Dialect-specific storage with portable fallbacks
+"""
+
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, PrimaryKeyConstraint, SmallInteger, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import INET, JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+# Binary, indexable JSON on PostgreSQL; plain JSON elsewhere. None is stored as SQL NULL
+JSONType = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+# Native inet on PostgreSQL (compact, CIDR-aware); IPv6-length text elsewhere
+IPType = String(45).with_variant(INET(), "postgresql")
+
+# 64-bit surrogate keys for append-heavy event tables; SQLite only
+# autoincrements a plain INTEGER primary key (already 64-bit there)
+EventIdType = BigInteger().with_variant(Integer(), "sqlite")
+
+# Two-byte keys for small reference tables, with the same SQLite caveat
+LookupIdType = SmallInteger().with_variant(Integer(), "sqlite")
+
+def _not_postgresql(ddl, target, bind, dialect=None, **kw) -> bool:
+    """DDL condition for indexes that only other backends should create"""
+    return dialect is not None and dialect.name != "postgresql"
+
+def time_range_indexes(name: str, column: str = "timestamp") -> tuple:
+    """BRIN index on PostgreSQL for insert-ordered timestamps, B-tree elsewhere"""
+    return (
+        Index(f"{name}_brin", column, postgresql_using="brin",
+              postgresql_with={"pages_per_range": 32}).ddl_if(dialect="postgresql"),
+        Index(name, column).ddl_if(callable_=_not_postgresql),
+    )
+
+def range_partition_keys(name: str, column: str = "timestamp") -> tuple:
+    """Key constraints for tables range-partitioned by column on PostgreSQL
+
+    A partitioned table's unique keys must contain the partition column, so
+    PostgreSQL gets a unique (id, column) key while other backends keep the
+    plain id primary key.
+    """
+    return (
+        PrimaryKeyConstraint("id").ddl_if(callable_=_not_postgresql),
+        UniqueConstraint("id", column, name=name).ddl_if(dialect="postgresql"),
+    )
+
+class utcnow(FunctionElement):
+    """Current UTC time, evaluated by the database server"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"  # SQLite keeps CURRENT_TIMESTAMP in UTC
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+@compiles(utcnow, "mysql")
+def _utcnow_mysql(element, compiler, **kw):
+    return "(UTC_TIMESTAMP())"
@@ -3,54 +3,68 @@ Honeypot-related database models
 Models for honeypot events and attacker profiles
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Text, Boolean
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Float, Text, Boolean, ForeignKey, Index, desc, event
+from sqlalchemy.orm import Mapped, MappedAsDataclass, mapped_column
 from datetime import datetime
+from typing import Optional
 
-from ..database.connection import Base
+from ..database.connection import Base, invalidate_cached_entity
+from .column_types import EventIdType, IPType, JSONType, range_partition_keys, time_range_indexes, utcnow
+from .lookup_models import HoneypotType
 
-class HoneypotEvent(Base):
+class HoneypotEvent(MappedAsDataclass, Base, eq=False):
     """Model for honeypot interaction events"""
     __tablename__ = "honeypot_events"
+    __table_args__ = (
+        *range_partition_keys("uq_honeypot_id_ts"),
+        *time_range_indexes("ix_honeypot_ts"),
+        Index("ix_honeypot_src_ts", "source_ip", desc("timestamp")),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
-    honeypot_id = Column(String(100), nullable=False, index=True)
-    honeypot_type = Column(String(50), nullable=False)  # ssh, http, ftp, etc.
-    honeypot_port = Column(Integer, nullable=False)
-    source_ip = Column(String(45), nullable=False, index=True)
-    source_port = Column(Integer)
-    interaction_type = Column(String(100))  # login_attempt, file_download, etc.
-    duration = Column(Float)  # Interaction duration in seconds
-    successful = Column(Boolean, default=False)
-    commands = Column(JSON)  # List of commands executed
-    payloads = Column(JSON)  # List of payloads/data sent
-    user_agent = Column(String(500))
-    session_data = Column(JSON)  # Additional session information
-    geolocation = Column(JSON)  # Geographic information if available
-    created_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(EventIdType, primary_key=True, init=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), init=False)
+    honeypot_id: Mapped[str] = mapped_column(String(100), index=True)
+    honeypot_type_id: Mapped[int] = mapped_column(SmallInteger, ForeignKey(HoneypotType.id))  # ssh, http, ftp, etc.
+    honeypot_port: Mapped[int] = mapped_column(Integer)
+    source_ip: Mapped[str] = mapped_column(IPType, index=True)
+    source_port: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    interaction_type: Mapped[Optional[str]] = mapped_column(String(100), default=None)  # login_attempt, file_download, etc.
+    duration: Mapped[Optional[float]] = mapped_column(Float, default=None)  # Interaction duration in seconds
+    successful: Mapped[bool] = mapped_column(Boolean, default=False)
+    commands: Mapped[Optional[list]] = mapped_column(JSONType, default=None)  # List of commands executed
+    payloads: Mapped[Optional[list]] = mapped_column(JSONType, default=None)  # List of payloads/data sent
+    user_agent: Mapped[Optional[str]] = mapped_column(String(500), default=None)
+    session_data: Mapped[Optional[dict]] = mapped_column(JSONType, default=None)  # Additional session information
+    geolocation: Mapped[Optional[dict]] = mapped_column(JSONType, default=None)  # Geographic information if available
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), init=False)
 
 class AttackerProfile(Base):
     """Model for attacker behavioral profiles"""
     __tablename__ = "attacker_profiles"
     
     id = Column(Integer, primary_key=True, index=True)
-    source_ip = Column(String(45), nullable=False, unique=True, index=True)
-    first_seen = Column(DateTime, default=datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.utcnow)
+    source_ip = Column(IPType, nullable=False, unique=True, index=True)
+    first_seen = Column(DateTime, server_default=utcnow())
+    last_seen = Column(DateTime, server_default=utcnow())
     total_interactions = Column(Integer, default=0)
     successful_interactions = Column(Integer, default=0)
-    targeted_services = Column(JSON)  # Services this attacker has targeted
-    attack_patterns = Column(JSON)  # Behavioral patterns observed
-    tools_used = Column(JSON)  # Tools and techniques identified
+    targeted_services = Column(JSONType)  # Services this attacker has targeted
+    attack_patterns = Column(JSONType)  # Behavioral patterns observed
+    tools_used = Column(JSONType)  # Tools and techniques identified
     persistence_score = Column(Float, default=0.0)  # How persistent is this attacker
     sophistication_score = Column(Float, default=0.0)  # Technical sophistication
     threat_level = Column(String(20), default="low")  # low, medium, high, critical
     is_bot = Column(Boolean, default=False)
-    geolocation = Column(JSON)  # Geographic information
-    isp_info = Column(JSON)  # ISP and network information
+    geolocation = Column(JSONType)  # Geographic information
+    isp_info = Column(JSONType)  # ISP and network information
     notes = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
+
+# Session-scoped lookups must not hand out rows changed in the same scope
+event.listen(AttackerProfile, "after_update", invalidate_cached_entity)
+event.listen(AttackerProfile, "after_delete", invalidate_cached_entity)
 
 class HoneypotInstance(Base):
     """Model for honeypot instances"""
@@ -60,33 +74,37 @@ class HoneypotInstance(Base):
     instance_id = Column(String(100), nullable=False, unique=True, index=True)
     service_type = Column(String(50), nullable=False)
     port = Column(Integer, nullable=False)
-    ip_address = Column(String(45), nullable=False)
+    ip_address = Column(IPType, nullable=False)
     status = Column(String(20), default="running")  # running, stopped, error
-    configuration = Column(JSON)  # Honeypot configuration
-    deployed_at = Column(DateTime, default=datetime.utcnow)
+    configuration = Column(JSONType)  # Honeypot configuration
+    deployed_at = Column(DateTime, server_default=utcnow())
     last_interaction = Column(DateTime)
     total_interactions = Column(Integer, default=0)
     unique_attackers = Column(Integer, default=0)
     data_collected = Column(Integer, default=0)  # Amount of data collected in bytes
     effectiveness_score = Column(Float, default=0.0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
 class DeceptionEvent(Base):
     """Model for deception strategy events"""
     __tablename__ = "deception_events"
+    __table_args__ = (
+        *time_range_indexes("ix_deception_ts"),
+        Index("ix_deception_target_ts", "target_ip", desc("timestamp")),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    id = Column(EventIdType, primary_key=True)
+    timestamp = Column(DateTime, server_default=utcnow())
     event_type = Column(String(50), nullable=False)  # deploy, modify, trigger, etc.
-    target_ip = Column(String(45), index=True)
+    target_ip = Column(IPType, index=True)
     deception_type = Column(String(100))  # fake_service, honeypot, breadcrumb, etc.
     strategy_id = Column(String(100))
     success = Column(Boolean, default=False)
-    interaction_data = Column(JSON)
+    interaction_data = Column(JSONType)
     effectiveness = Column(Float)  # How effective was this deception
-    learning_data = Column(JSON)  # Data learned from this interaction
-    created_at = Column(DateTime, default=datetime.utcnow)
+    learning_data = Column(JSONType)  # Data learned from this interaction
+    created_at = Column(DateTime, server_default=utcnow())
 
 class AttackSession(Base):
     """Model for tracking complete attack sessions"""
@@ -94,17 +112,17 @@ class AttackSession(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(100), nullable=False, unique=True, index=True)
-    source_ip = Column(String(45), nullable=False, index=True)
-    start_time = Column(DateTime, default=datetime.utcnow)
+    source_ip = Column(IPType, nullable=False, index=True)
+    start_time = Column(DateTime, server_default=utcnow())
     end_time = Column(DateTime)
     duration = Column(Float)  # Session duration in seconds
     total_events = Column(Integer, default=0)
-    honeypots_interacted = Column(JSON)  # List of honeypots interacted with
-    attack_progression = Column(JSON)  # Timeline of attack activities
-    techniques_used = Column(JSON)  # MITRE ATT&CK techniques observed
+    honeypots_interacted = Column(JSONType)  # List of honeypots interacted with
+    attack_progression = Column(JSONType)  # Timeline of attack activities
+    techniques_used = Column(JSONType)  # MITRE ATT&CK techniques observed
     data_exfiltrated = Column(Integer, default=0)  # Bytes of data attempted to exfiltrate
     success_rate = Column(Float, default=0.0)  # Percentage of successful interactions
     risk_score = Column(Float, default=0.0)
     classification = Column(String(50))  # automated, manual, advanced_persistent, etc.
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
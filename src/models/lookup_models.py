@@ -0,0 +1,86 @@
+"""
+Reference tables for repeated event attributes
+Small lookup tables referenced by id from the high-volume event tables
+"""
+
+from sqlalchemy import Column, String, select
+
+from ..database.connection import Base
+from .column_types import LookupIdType
+
+class Protocol(Base):
+    """Transport and network protocols (tcp, udp, icmp, ...)"""
+    __tablename__ = "protocols"
+    
+    id = Column(LookupIdType, primary_key=True)
+    name = Column(String(20), nullable=False, unique=True)
+
+class EventType(Base):
+    """Network and connection event types"""
+    __tablename__ = "event_types"
+    
+    id = Column(LookupIdType, primary_key=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+class HoneypotType(Base):
+    """Honeypot service types"""
+    __tablename__ = "honeypot_types"
+    
+    id = Column(LookupIdType, primary_key=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+class Severity(Base):
+    """Threat severity levels"""
+    __tablename__ = "severities"
+    
+    id = Column(LookupIdType, primary_key=True)
+    name = Column(String(20), nullable=False, unique=True)
+
+# Rows seeded at startup so common writes never need a lookup roundtrip
+LOOKUP_SEEDS = {
+    Protocol: ("tcp", "udp", "icmp", "icmpv6", "other"),
+    EventType: ("packet", "connection", "anomaly", "establish", "data_transfer", "close"),
+    HoneypotType: ("ssh", "http", "ftp", "telnet", "smtp"),
+    Severity: ("low", "medium", "high", "critical"),
+}
+
+def analyst_views() -> dict:
+    """Views re-joining lookup names onto the event tables, keyed by view name"""
+    from .network_models import NetworkEvent, ConnectionEvent
+    from .honeypot_models import HoneypotEvent
+    from .threat_models import ThreatEvent
+    
+    network = NetworkEvent.__table__
+    connection = ConnectionEvent.__table__
+    honeypot = HoneypotEvent.__table__
+    threat = ThreatEvent.__table__
+    protocol = Protocol.__table__
+    event_type = EventType.__table__
+    honeypot_type = HoneypotType.__table__
+    severity = Severity.__table__
+    
+    return {
+        "network_events_view": select(
+            network, event_type.c.name.label("event_type"), protocol.c.name.label("protocol")
+        ).select_from(
+            network.outerjoin(event_type, network.c.event_type_id == event_type.c.id)
+                   .outerjoin(protocol, network.c.protocol_id == protocol.c.id)
+        ),
+        "connection_events_view": select(
+            connection, event_type.c.name.label("event_type"), protocol.c.name.label("protocol")
+        ).select_from(
+            connection.outerjoin(event_type, connection.c.event_type_id == event_type.c.id)
+                      .outerjoin(protocol, connection.c.protocol_id == protocol.c.id)
+        ),
+        "honeypot_events_view": select(
+            honeypot, honeypot_type.c.name.label("honeypot_type")
+        ).select_from(
+            honeypot.outerjoin(honeypot_type, honeypot.c.honeypot_type_id == honeypot_type.c.id)
+        ),
+        "threat_events_view": select(
+            threat, protocol.c.name.label("protocol"), severity.c.name.label("severity")
+        ).select_from(
+            threat.outerjoin(protocol, threat.c.protocol_id == protocol.c.id)
+                  .outerjoin(severity, threat.c.severity_id == severity.c.id)
+        ),
+    }
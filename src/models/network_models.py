@@ -3,69 +3,90 @@ Network-related database models
 Models for network events and connections
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Text, Boolean
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Float, Text, Boolean, LargeBinary, ForeignKey, Index, desc
+from sqlalchemy.orm import Mapped, MappedAsDataclass, mapped_column
 from datetime import datetime
+from typing import Optional
 
 from ..database.connection import Base
+from .column_types import EventIdType, IPType, JSONType, range_partition_keys, time_range_indexes, utcnow
+from .lookup_models import EventType, Protocol
 
-class NetworkEvent(Base):
+class NetworkEvent(MappedAsDataclass, Base, eq=False):
     """Model for network events and traffic analysis"""
     __tablename__ = "network_events"
+    __table_args__ = (
+        *range_partition_keys("uq_network_id_ts"),
+        *time_range_indexes("ix_network_ts"),
+        Index("ix_network_src_dst_ts", "source_ip", "destination_ip", desc("timestamp"),
+              postgresql_include=["risk_score", "is_suspicious"]),
+        Index("ix_net_src_inet", "source_ip", postgresql_using="gist",
+              postgresql_ops={"source_ip": "inet_ops"}).ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
-    event_type = Column(String(50), nullable=False, index=True)  # packet, connection, anomaly
-    source_ip = Column(String(45), nullable=False, index=True)
-    destination_ip = Column(String(45), nullable=False, index=True)
-    source_port = Column(Integer)
-    destination_port = Column(Integer)
-    protocol = Column(String(20), nullable=False)
-    packet_size = Column(Integer)
-    flags = Column(JSON)  # Protocol-specific flags
-    payload_hash = Column(String(64))  # SHA256 hash of payload
-    payload_size = Column(Integer)
-    interface = Column(String(50))  # Network interface
-    direction = Column(String(20))  # inbound, outbound, internal
-    risk_score = Column(Float, default=0.0)
-    anomaly_score = Column(Float, default=0.0)
-    is_suspicious = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(EventIdType, primary_key=True, init=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), init=False)
+    event_type_id: Mapped[int] = mapped_column(SmallInteger, ForeignKey(EventType.id), index=True)  # packet, connection, anomaly
+    source_ip: Mapped[str] = mapped_column(IPType, index=True)
+    destination_ip: Mapped[str] = mapped_column(IPType, index=True)
+    protocol_id: Mapped[int] = mapped_column(SmallInteger, ForeignKey(Protocol.id))
+    source_port: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    destination_port: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    packet_size: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    flags: Mapped[Optional[dict]] = mapped_column(JSONType, default=None)  # Protocol-specific flags
+    payload_hash: Mapped[Optional[bytes]] = mapped_column(LargeBinary(32), index=True, default=None)  # Raw SHA256 digest of payload
+    payload_size: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    interface: Mapped[Optional[str]] = mapped_column(String(50), default=None)  # Network interface
+    direction: Mapped[Optional[str]] = mapped_column(String(20), default=None)  # inbound, outbound, internal
+    risk_score: Mapped[float] = mapped_column(Float, default=0.0)
+    anomaly_score: Mapped[float] = mapped_column(Float, default=0.0)
+    is_suspicious: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), init=False)
 
-class ConnectionEvent(Base):
+class ConnectionEvent(MappedAsDataclass, Base, eq=False):
     """Model for network connection tracking"""
     __tablename__ = "connection_events"
+    __table_args__ = (
+        *time_range_indexes("ix_connection_ts"),
+        Index("ix_connection_id_ts", "connection_id", desc("timestamp")),
+        Index("ix_connection_src_ts", "source_ip", desc("timestamp")),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
-    connection_id = Column(String(100), nullable=False, index=True)
-    event_type = Column(String(50), nullable=False)  # establish, data_transfer, close
-    source_ip = Column(String(45), nullable=False, index=True)
-    destination_ip = Column(String(45), nullable=False, index=True)
-    source_port = Column(Integer)
-    destination_port = Column(Integer)
-    protocol = Column(String(20), nullable=False)
-    connection_state = Column(String(20))  # ESTABLISHED, CLOSED, etc.
-    bytes_sent = Column(Integer, default=0)
-    bytes_received = Column(Integer, default=0)
-    packets_sent = Column(Integer, default=0)
-    packets_received = Column(Integer, default=0)
-    duration = Column(Float)  # Connection duration in seconds
-    is_encrypted = Column(Boolean, default=False)
-    application_protocol = Column(String(50))  # HTTP, HTTPS, SSH, etc.
-    user_agent = Column(String(500))
-    process_name = Column(String(200))
-    process_id = Column(Integer)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(EventIdType, primary_key=True, init=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), init=False)
+    connection_id: Mapped[str] = mapped_column(String(100), index=True)
+    event_type_id: Mapped[int] = mapped_column(SmallInteger, ForeignKey(EventType.id))  # establish, data_transfer, close
+    source_ip: Mapped[str] = mapped_column(IPType, index=True)
+    destination_ip: Mapped[str] = mapped_column(IPType, index=True)
+    protocol_id: Mapped[int] = mapped_column(SmallInteger, ForeignKey(Protocol.id))
+    source_port: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    destination_port: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    connection_state: Mapped[Optional[str]] = mapped_column(String(20), default=None)  # ESTABLISHED, CLOSED, etc.
+    bytes_sent: Mapped[int] = mapped_column(Integer, default=0)
+    bytes_received: Mapped[int] = mapped_column(Integer, default=0)
+    packets_sent: Mapped[int] = mapped_column(Integer, default=0)
+    packets_received: Mapped[int] = mapped_column(Integer, default=0)
+    duration: Mapped[Optional[float]] = mapped_column(Float, default=None)  # Connection duration in seconds
+    is_encrypted: Mapped[bool] = mapped_column(Boolean, default=False)
+    application_protocol: Mapped[Optional[str]] = mapped_column(String(50), default=None)  # HTTP, HTTPS, SSH, etc.
+    user_agent: Mapped[Optional[str]] = mapped_column(String(500), default=None)
+    process_name: Mapped[Optional[str]] = mapped_column(String(200), default=None)
+    process_id: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), init=False)
 
 class TrafficStatistics(Base):
     """Model for aggregated traffic statistics"""
     __tablename__ = "traffic_statistics"
+    __table_args__ = (
+        *time_range_indexes("ix_traffic_ts"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    id = Column(EventIdType, primary_key=True)
+    timestamp = Column(DateTime, server_default=utcnow())
     time_window = Column(String(20), nullable=False)  # 1min, 5min, 1hour, 1day
-    source_ip = Column(String(45), index=True)
-    destination_ip = Column(String(45), index=True)
+    source_ip = Column(IPType, index=True)
+    destination_ip = Column(IPType, index=True)
     protocol = Column(String(20))
     port = Column(Integer)
     packet_count = Column(Integer, default=0)
@@ -77,7 +98,7 @@ class TrafficStatistics(Base):
     peak_rate = Column(Float, default=0.0)  # Peak packets/bytes per second
     anomaly_score = Column(Float, default=0.0)
     baseline_deviation = Column(Float, default=0.0)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
 
 class BehavioralBaseline(Base):
     """Model for storing behavioral baselines"""
@@ -88,33 +109,33 @@ class BehavioralBaseline(Base):
     entity_type = Column(String(50), nullable=False)  # ip, user, network
     baseline_type = Column(String(50), nullable=False)  # traffic, timing, protocol
     time_period = Column(String(20), nullable=False)  # hourly, daily, weekly
-    baseline_data = Column(JSON)  # Statistical baseline information
+    baseline_data = Column(JSONType)  # Statistical baseline information
     confidence_level = Column(Float, default=0.0)
     sample_size = Column(Integer, default=0)
-    last_updated = Column(DateTime, default=datetime.utcnow)
+    last_updated = Column(DateTime, server_default=utcnow())
     next_update = Column(DateTime)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
 class NetworkAnomaly(Base):
     """Model for network anomalies detected by behavioral analysis"""
     __tablename__ = "network_anomalies"
     
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, server_default=utcnow(), index=True)
     anomaly_type = Column(String(100), nullable=False, index=True)
     entity_id = Column(String(100), nullable=False, index=True)
     entity_type = Column(String(50), nullable=False)
     severity = Column(Float, nullable=False)
     confidence = Column(Float, nullable=False)
     baseline_deviation = Column(Float)
-    anomaly_features = Column(JSON)  # Features that triggered the anomaly
-    baseline_comparison = Column(JSON)  # Comparison with baseline
-    related_events = Column(JSON)  # Related network events
-    context_data = Column(JSON)  # Additional context information
+    anomaly_features = Column(JSONType)  # Features that triggered the anomaly
+    baseline_comparison = Column(JSONType)  # Comparison with baseline
+    related_events = Column(JSONType)  # Related network events
+    context_data = Column(JSONType)  # Additional context information
     is_confirmed = Column(Boolean, default=False)
     is_false_positive = Column(Boolean, default=False)
     investigation_notes = Column(Text)
     resolved_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
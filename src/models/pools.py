@@ -0,0 +1,23 @@
+"""
+Event row pools
+Reusable dict buffers for event rows passed from capture to the database writer
+"""
+
+from collections import deque
+
+POOL_SIZE = 4096
+
+# deque.append/pop are atomic, so capture threads and the event loop share it without locks
+_free_rows = deque(maxlen=POOL_SIZE)
+
+def acquire_event_dict() -> dict:
+    """Take an empty row dict from the pool, allocating one if the pool is empty"""
+    try:
+        return _free_rows.pop()
+    except IndexError:
+        return {}
+
+def release_event_dict(row: dict):
+    """Clear a row dict and return it to the pool (dropped once the pool is full)"""
+    row.clear()
+    _free_rows.append(row)
@@ -3,55 +3,73 @@ Threat-related database models
 Models for threat events, IOCs, and threat patterns
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Text, Boolean
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Float, Text, Boolean, ForeignKey, Index, desc, event
+from sqlalchemy.orm import Mapped, MappedAsDataclass, mapped_column
 from sqlalchemy.sql import func
 from datetime import datetime
+from typing import Optional
 
-from ..database.connection import Base
+from ..database.connection import Base, invalidate_cached_entity
+from .column_types import EventIdType, IPType, JSONType, time_range_indexes, utcnow
+from .lookup_models import Protocol, Severity
 
-class ThreatEvent(Base):
+class ThreatEvent(MappedAsDataclass, Base, eq=False):
     """Model for threat detection events"""
     __tablename__ = "threat_events"
+    __table_args__ = (
+        *time_range_indexes("ix_threat_ts"),
+        Index("ix_threat_indicators_gin", "indicators", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_threat_type_severity_ts", "threat_type", "severity_id", desc("timestamp"),
+              postgresql_include=["confidence"]),
+        Index("ix_threat_src_ts", "source_ip", desc("timestamp")),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
-    threat_type = Column(String(100), nullable=False, index=True)
-    confidence = Column(Float, nullable=False)
-    source_ip = Column(String(45), index=True)  # IPv6 compatible
-    target_ip = Column(String(45), index=True)
-    source_port = Column(Integer)
-    target_port = Column(Integer)
-    protocol = Column(String(20))
-    severity = Column(String(20), index=True)  # low, medium, high, critical
-    description = Column(Text)
-    indicators = Column(JSON)  # Dictionary of threat indicators
-    recommended_actions = Column(JSON)  # List of recommended actions
-    status = Column(String(20), default="active")  # active, resolved, false_positive
-    resolved_at = Column(DateTime)
-    resolved_by = Column(String(100))
-    notes = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(EventIdType, primary_key=True, init=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), init=False)
+    threat_type: Mapped[str] = mapped_column(String(100), index=True)
+    confidence: Mapped[float] = mapped_column(Float)
+    source_ip: Mapped[Optional[str]] = mapped_column(IPType, index=True, default=None)  # IPv6 compatible
+    target_ip: Mapped[Optional[str]] = mapped_column(IPType, index=True, default=None)
+    source_port: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    target_port: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    protocol_id: Mapped[Optional[int]] = mapped_column(SmallInteger, ForeignKey(Protocol.id), default=None)
+    severity_id: Mapped[Optional[int]] = mapped_column(SmallInteger, ForeignKey(Severity.id), index=True, default=None)  # low, medium, high, critical
+    description: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    indicators: Mapped[Optional[dict]] = mapped_column(JSONType, default=None)  # Dictionary of threat indicators
+    recommended_actions: Mapped[Optional[list]] = mapped_column(JSONType, default=None)  # List of recommended actions
+    status: Mapped[str] = mapped_column(String(20), default="active")  # active, resolved, false_positive
+    resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=None)
+    resolved_by: Mapped[Optional[str]] = mapped_column(String(100), default=None)
+    notes: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), init=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow(), init=False)
 
 class IOC(Base):
     """Model for Indicators of Compromise"""
     __tablename__ = "iocs"
+    __table_args__ = (
+        Index("ix_ioc_tags_gin", "tags", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     ioc_type = Column(String(50), nullable=False, index=True)  # ip, domain, hash, etc.
     value = Column(String(500), nullable=False, index=True)
     confidence = Column(Float, default=0.5)
     source = Column(String(100))  # Source of the IOC
-    first_seen = Column(DateTime, default=datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.utcnow)
+    first_seen = Column(DateTime, server_default=utcnow())
+    last_seen = Column(DateTime, server_default=utcnow())
     times_seen = Column(Integer, default=1)
-    threat_types = Column(JSON)  # Associated threat types
-    context = Column(JSON)  # Additional context information
+    threat_types = Column(JSONType)  # Associated threat types
+    context = Column(JSONType)  # Additional context information
     is_active = Column(Boolean, default=True)
     expiry_date = Column(DateTime)
-    tags = Column(JSON)  # List of tags
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    tags = Column(JSONType)  # List of tags
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
+
+# Drop updated or deleted IOCs from the per-session lookup cache
+event.listen(IOC, "after_update", invalidate_cached_entity)
+event.listen(IOC, "after_delete", invalidate_cached_entity)
 
 class ThreatPattern(Base):
     """Model for threat patterns and signatures"""
@@ -61,8 +79,8 @@ class ThreatPattern(Base):
     name = Column(String(200), nullable=False, unique=True, index=True)
     pattern_type = Column(String(50), nullable=False)  # behavioral, network, temporal
     description = Column(Text)
-    pattern_data = Column(JSON)  # Pattern definition and rules
-    threshold_config = Column(JSON)  # Threshold configuration
+    pattern_data = Column(JSONType)  # Pattern definition and rules
+    threshold_config = Column(JSONType)  # Threshold configuration
     severity = Column(String(20), default="medium")
     is_enabled = Column(Boolean, default=True)
     detection_count = Column(Integer, default=0)
@@ -71,8 +89,8 @@ class ThreatPattern(Base):
     last_triggered = Column(DateTime)
     created_by = Column(String(100))
     version = Column(Integer, default=1)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
 class ThreatIntelligence(Base):
     """Model for threat intelligence feeds and data"""
@@ -82,7 +100,7 @@ class ThreatIntelligence(Base):
     feed_name = Column(String(100), nullable=False, index=True)
     feed_url = Column(String(500))
     intel_type = Column(String(50), nullable=False)  # ioc, campaign, actor, etc.
-    data = Column(JSON)  # Intelligence data
+    data = Column(JSONType)  # Intelligence data
     confidence = Column(Float)
     source_reliability = Column(String(20))  # A, B, C, D, E, F
     information_credibility = Column(String(20))  # 1, 2, 3, 4, 5, 6
@@ -90,25 +108,28 @@ class ThreatIntelligence(Base):
     published_date = Column(DateTime)
     expiry_date = Column(DateTime)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
 class AttackCampaign(Base):
     """Model for tracking attack campaigns"""
     __tablename__ = "attack_campaigns"
+    __table_args__ = (
+        Index("ix_campaign_iocs_gin", "iocs", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     campaign_name = Column(String(200), nullable=False, unique=True, index=True)
     description = Column(Text)
-    first_detected = Column(DateTime, default=datetime.utcnow)
-    last_activity = Column(DateTime, default=datetime.utcnow)
-    threat_actors = Column(JSON)  # List of associated threat actors
-    ttps = Column(JSON)  # Tactics, Techniques, and Procedures
-    targets = Column(JSON)  # Target information
-    iocs = Column(JSON)  # Associated IOCs
+    first_detected = Column(DateTime, server_default=utcnow())
+    last_activity = Column(DateTime, server_default=utcnow())
+    threat_actors = Column(JSONType)  # List of associated threat actors
+    ttps = Column(JSONType)  # Tactics, Techniques, and Procedures
+    targets = Column(JSONType)  # Target information
+    iocs = Column(JSONType)  # Associated IOCs
     severity = Column(String(20), default="medium")
     status = Column(String(20), default="active")  # active, dormant, concluded
     confidence = Column(Float, default=0.5)
-    attribution = Column(JSON)  # Attribution information
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    attribution = Column(JSONType)  # Attribution information
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
@@ -3,25 +3,209 @@ Feature extraction utilities for machine learning models
 Converts network data into numerical features for ML analysis
 """
 
+import asyncio
 import numpy as np
-import pandas as pd
-from typing import Dict, Any, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import hashlib
+from functools import lru_cache
 import ipaddress
-from collections import defaultdict
 import re
+import socket
+import struct
+import zlib
+
+try:
+    from numba import njit
+except ImportError:
+    # Fallback for environments without numba: run the kernels as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+def _prefixed(prefix: str, names: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(f'{prefix}_{name}' for name in names)
+
+# Protocols one-hot encoded by the feature table; packets use the first four
+PROTOCOL_ONE_HOT = ('TCP', 'UDP', 'ICMP', 'ARP', 'IGMP')
+
+_IP_FEATURE_NAMES = ('private', 'loopback', 'multicast', 'reserved', 'octet_1', 'octet_2', 'octet_3', 'octet_4')
+_PORT_FEATURE_NAMES = ('port', 'well_known', 'registered', 'dynamic', 'category')
+
+# Column names of extract_packet_features_batch, in order
+PACKET_FEATURE_NAMES = (
+    ('size', 'size_tiny', 'size_small', 'size_medium', 'size_large')
+    + _prefixed('src', _IP_FEATURE_NAMES) + _prefixed('dst', _IP_FEATURE_NAMES)
+    + ('same_ip', 'ip_distance')
+    + _prefixed('src', _PORT_FEATURE_NAMES) + _prefixed('dst', _PORT_FEATURE_NAMES)
+    + ('proto_tcp', 'proto_udp', 'proto_icmp', 'proto_arp', 'protocol_weight')
+    + ('tcp_syn', 'tcp_ack', 'tcp_fin', 'tcp_rst', 'tcp_psh', 'tcp_urg')
+    + ('hour', 'minute', 'weekday', 'business_hours', 'night_time', 'weekend')
+    + ('payload_entropy', 'payload_hex_ratio', 'payload_md5_count', 'payload_sha1_count', 'payload_base64_count')
+)
+
+# Column ranges of each feature block in a packet feature vector
+_BASIC_COLUMNS = slice(0, 5)
+_IP_COLUMNS = slice(5, 23)
+_PORT_COLUMNS = slice(23, 33)
+_PROTOCOL_COLUMNS = slice(33, 44)
+_TIMING_COLUMNS = slice(44, 50)
+_PAYLOAD_COLUMNS = slice(50, 55)
+
+@lru_cache(maxsize=None)
+def packet_feature_schema():
+    """Arrow schema of extract_packet_features_record_batch: one float32 field per feature"""
+    import pyarrow as pa
+    return pa.schema([(name, pa.float32()) for name in PACKET_FEATURE_NAMES])
+
+# Distinct addresses whose parsed features are kept; traces reuse a small set heavily
+IP_CACHE_SIZE = 16384
+
+# IPv4 special ranges as (network, netmask) pairs, mirroring the ipaddress module
+_IPV4_PRIVATE = tuple(
+    (int(net.network_address), int(net.netmask)) for net in map(ipaddress.IPv4Network, (
+        '0.0.0.0/8', '10.0.0.0/8', '127.0.0.0/8', '169.254.0.0/16', '172.16.0.0/12',
+        '192.0.0.0/29', '192.0.0.170/31', '192.0.2.0/24', '192.168.0.0/16', '198.18.0.0/15',
+        '198.51.100.0/24', '203.0.113.0/24', '240.0.0.0/4', '255.255.255.255/32',
+    ))
+)
+
+@lru_cache(maxsize=IP_CACHE_SIZE)
+def _parse_ipv4(ip_str: str) -> Optional[int]:
+    """Dotted-quad IPv4 address as an int, or None for IPv6 and invalid strings"""
+    try:
+        return struct.unpack('!I', socket.inet_pton(socket.AF_INET, ip_str))[0]
+    except (OSError, ValueError):
+        return None
+
+def _parse_ipv4_column(addresses: np.ndarray):
+    """Parse a column of address strings into uint32 values and an is-IPv4 mask"""
+    parsed = [_parse_ipv4(address) for address in addresses.tolist()]
+    is_ipv4 = np.array([value is not None for value in parsed], dtype=bool)
+    values = np.array([value or 0 for value in parsed], dtype=np.uint32)
+    return values, is_ipv4
+
+_PAYLOAD_PATTERNS = (
+    re.compile(r'[0-9a-fA-F]{32}'),  # MD5-like hashes
+    re.compile(r'[0-9a-fA-F]{40}'),  # SHA1-like hashes
+    re.compile(r'(?:[A-Za-z0-9+/]{4}){2,}(?:[A-Za-z0-9+/]{2}==|[A-Za-z0-9+/]{3}=)?'),  # Base64 runs
+)
+
+@njit(cache=True)
+def _entropy_from_counts(counts, length):
+    """Shannon entropy in bits of a symbol histogram"""
+    entropy = 0.0
+    for count in counts:
+        if count:
+            probability = count / length
+            entropy -= probability * np.log2(probability)
+    return entropy
+
+@njit(cache=True)
+def _entropy_u8(buf):
+    """Shannon entropy in bits of a uint8 buffer, via a 256-bucket histogram"""
+    counts = np.zeros(256, np.int64)
+    for b in buf:
+        counts[b] += 1
+    return _entropy_from_counts(counts, buf.shape[0])
+
+@njit(cache=True)
+def _size_features(sizes, out):
+    """Size and size-bucket columns in one pass, with branch-free bucket comparisons"""
+    for i in range(sizes.shape[0]):
+        size = sizes[i]
+        out[i, 0] = size
+        out[i, 1] = size < 64
+        out[i, 2] = (size >= 64) & (size < 512)
+        out[i, 3] = (size >= 512) & (size < 1500)
+        out[i, 4] = size >= 1500
+
+@njit(cache=True)
+def _timing_features(ns, out):
+    """Time-of-day and calendar columns from epoch nanoseconds in one pass"""
+    for i in range(ns.shape[0]):
+        seconds = ns[i] // 1000000000
+        minute_of_day = seconds // 60 % 1440
+        hour = minute_of_day // 60
+        weekday = (seconds // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        out[i, 0] = hour / 24.0
+        out[i, 1] = minute_of_day % 60 / 60.0
+        out[i, 2] = weekday / 7.0
+        out[i, 3] = (hour >= 9) & (hour <= 17)
+        out[i, 4] = (hour < 6) | (hour > 22)
+        out[i, 5] = weekday >= 5
+
+def _ipv6_hash(value: int) -> int:
+    """32-bit Fibonacci hash of a 128-bit address, folded to 64 bits first"""
+    folded = (value >> 64) ^ (value & 0xFFFFFFFFFFFFFFFF)
+    return ((folded * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32
+
+def _ipv4_features(values):
+    """Type flags and normalized octets for IPv4 values, as an int or a uint32 array"""
+    is_private = False
+    for network, netmask in _IPV4_PRIVATE:
+        is_private = is_private | (values & netmask == network)
+    
+    return [
+        is_private,
+        values >> 24 == 127,    # Loopback
+        values >> 28 == 0xE,    # Multicast
+        values >> 28 == 0xF,    # Reserved
+        (values >> 24 & 0xFF) / 255.0,
+        (values >> 16 & 0xFF) / 255.0,
+        (values >> 8 & 0xFF) / 255.0,
+        (values & 0xFF) / 255.0,
+    ]
+
+@lru_cache(maxsize=IP_CACHE_SIZE)
+def _single_ip_features(ip_str: str) -> Tuple[float, ...]:
+    """Type flags and octet (or hash) features of an address, cached for hot addresses"""
+    value = _parse_ipv4(ip_str)
+    if value is not None:
+        return tuple(float(f) for f in _ipv4_features(value))
+    
+    features = []
+    
+    try:
+        ip = ipaddress.ip_address(ip_str)
+        
+        # IP type features
+        features.append(1.0 if ip.is_private else 0.0)
+        features.append(1.0 if ip.is_loopback else 0.0)
+        features.append(1.0 if ip.is_multicast else 0.0)
+        features.append(1.0 if ip.is_reserved else 0.0)
+        
+        # For IPv6, use hash-based features
+        ip_hash = _ipv6_hash(int(ip))
+        features.extend([
+            float((ip_hash >> 24) & 0xFF) / 255.0,
+            float((ip_hash >> 16) & 0xFF) / 255.0,
+            float((ip_hash >> 8) & 0xFF) / 255.0,
+            float(ip_hash & 0xFF) / 255.0
+        ])
+        
+    except ValueError:
+        # Invalid IP address
+        features.extend([0.0] * 8)  # 4 type features + 4 octet features
+    
+    return tuple(features)
+
 class NetworkFeatureExtractor:
     """Extract features from network data for ML analysis"""
     
     def __init__(self):
         self.port_categories = self._initialize_port_categories()
+        self._category_values = {
+            category: zlib.crc32(category.encode()) % 100 / 100.0 for category in self.port_categories
+        }
+        self._port_table = self._build_port_table()
         self.protocol_weights = self._initialize_protocol_weights()
+        self._protocol_ids, self._protocol_table = self._build_protocol_table()
+        self._protocol_rows = self._protocol_table.tolist()
         self.feature_cache = {}
         
     def _initialize_port_categories(self) -> Dict[str, List[int]]:
@@ -39,6 +223,23 @@ class NetworkFeatureExtractor:
             'high_ports': list(range(49152, 65536))
         }
     
+    def _build_port_table(self) -> np.ndarray:
+        """Precompute the five _analyze_port features for every port number"""
+        ports = np.arange(65536)
+        table = np.zeros((65536, 5), dtype=np.float32)
+        table[:, 0] = ports / 65535.0
+        table[:, 1] = ports < 1024
+        table[:, 2] = (ports >= 1024) & (ports < 49152)
+        table[:, 3] = ports >= 49152
+        
+        # Assign in reverse so the first matching category wins
+        for category, category_ports in reversed(list(self.port_categories.items())):
+            table[category_ports, 4] = self._category_values[category]
+        
+        # Port 0 means "no port" and carries no features
+        table[0] = 0.0
+        return table
+    
     def _initialize_protocol_weights(self) -> Dict[str, float]:
         """Initialize protocol weights for anomaly detection"""
         return {
@@ -49,7 +250,18 @@ class NetworkFeatureExtractor:
             'IGMP': 0.3
         }
     
-    async def extract_packet_features(self, packet_data) -> Optional[np.ndarray]:
+    def _build_protocol_table(self):
+        """Map protocol names to rows of a one-hot and weight table whose last row is for other protocols"""
+        names = list(dict.fromkeys(PROTOCOL_ONE_HOT + tuple(self.protocol_weights)))
+        ids = {name: i for i, name in enumerate(names)}
+        
+        table = np.zeros((len(names) + 1, len(PROTOCOL_ONE_HOT) + 1), dtype=np.float64)
+        for i, name in enumerate(PROTOCOL_ONE_HOT):
+            table[ids[name], i] = 1.0
+        table[:, -1] = [self.protocol_weights.get(name, 0.1) for name in names] + [0.1]
+        return ids, table
+    
+    def extract_packet_features(self, packet_data) -> Optional[np.ndarray]:
         """Extract features from a network packet"""
         try:
             features = []
@@ -75,10 +287,70 @@ class NetworkFeatureExtractor:
             return np.array(features, dtype=np.float32)
             
         except Exception as e:
-            logger.error(f"Error extracting packet features: {e}")
+            logger.error("Error extracting packet features", error=str(e))
+            return None
+    
+    def extract_packet_features_batch(self, packets) -> Optional[np.ndarray]:
+        """Extract packet features for a columnar batch as an (N, F) matrix
+        
+        packets is a DataFrame or mapping of equal-length columns: size, src_ip,
+        dst_ip, src_port, dst_port, protocol, timestamp (datetimes or epoch ns) and
+        optionally tcp_flags and payload_preview. Row i matches the features
+        extract_packet_features returns for packet i.
+        """
+        try:
+            sizes = np.asarray(packets['size'], dtype=np.float64)
+            
+            # Blocks are cast into one float32 matrix instead of stacked and converted
+            features = np.empty((len(sizes), len(PACKET_FEATURE_NAMES)), dtype=np.float32)
+            ports = features[:, _PORT_COLUMNS]
+            
+            features[:, _BASIC_COLUMNS] = self._extract_basic_features_batch(sizes)
+            features[:, _IP_COLUMNS] = self._extract_ip_features_batch(packets['src_ip'], packets['dst_ip'])
+            ports[:, :5] = self._extract_port_features_batch(packets['src_port'])
+            ports[:, 5:] = self._extract_port_features_batch(packets['dst_port'])
+            features[:, _PROTOCOL_COLUMNS] = self._extract_protocol_features_batch(
+                packets['protocol'], packets.get('tcp_flags')
+            )
+            features[:, _TIMING_COLUMNS] = self._extract_timing_features_batch(packets['timestamp'])
+            features[:, _PAYLOAD_COLUMNS] = self._extract_payload_features_batch(
+                packets.get('payload_preview'), len(sizes)
+            )
+            
+            return features
+            
+        except Exception as e:
+            logger.error("Error extracting batch packet features", error=str(e))
+            return None
+    
+    def extract_packet_features_record_batch(self, packets):
+        """Extract batch features as a pyarrow RecordBatch with packet_feature_schema()
+        
+        Columns are laid out contiguously, so each Arrow array wraps its column
+        without copying and the batch can be handed to IPC or to_pandas() as is.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            logger.error("pyarrow is not installed; RecordBatch features are unavailable")
+            return None
+        
+        features = self.extract_packet_features_batch(packets)
+        if features is None:
             return None
+        
+        columns = np.asfortranarray(features)
+        return pa.RecordBatch.from_arrays(
+            [pa.array(columns[:, i]) for i in range(columns.shape[1])],
+            schema=packet_feature_schema()
+        )
+    
+    async def extract_packet_features_batch_async(self, packets) -> Optional[np.ndarray]:
+        """Extract batch features on the default executor so the caller can overlap other I/O"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.extract_packet_features_batch, packets)
     
-    async def extract_connection_features(self, connection_data) -> Optional[np.ndarray]:
+    def extract_connection_features(self, connection_data) -> Optional[np.ndarray]:
         """Extract features from connection data"""
         try:
             features = []
@@ -100,12 +372,13 @@ class NetworkFeatureExtractor:
             features.extend(protocol_features)
             
             # Timing features
-            hour = connection_data.timestamp.hour
+            timestamp = connection_data.timestamp
+            hour = timestamp.hour
             features.extend([
                 float(hour),
                 1.0 if 9 <= hour <= 17 else 0.0,  # Business hours
                 1.0 if hour < 6 or hour > 22 else 0.0,  # Night time
-                float(connection_data.timestamp.weekday()),
+                float(timestamp.weekday()),
             ])
             
             # IP address features
@@ -117,10 +390,10 @@ class NetworkFeatureExtractor:
             return np.array(features, dtype=np.float32)
             
         except Exception as e:
-            logger.error(f"Error extracting connection features: {e}")
+            logger.error("Error extracting connection features", error=str(e))
             return None
     
-    async def extract_anomaly_features(self, anomaly_data) -> Optional[np.ndarray]:
+    def extract_anomaly_features(self, anomaly_data) -> Optional[np.ndarray]:
         """Extract features from anomaly data"""
         try:
             features = []
@@ -158,7 +431,7 @@ class NetworkFeatureExtractor:
             return np.array(features, dtype=np.float32)
             
         except Exception as e:
-            logger.error(f"Error extracting anomaly features: {e}")
+            logger.error("Error extracting anomaly features", error=str(e))
             return None
     
     def _extract_basic_packet_features(self, packet_data) -> List[float]:
@@ -176,6 +449,12 @@ class NetworkFeatureExtractor:
         
         return features
     
+    def _extract_basic_features_batch(self, sizes: np.ndarray) -> np.ndarray:
+        """Size and size-bucket columns for a batch"""
+        features = np.empty((len(sizes), 5), dtype=np.float64)
+        _size_features(sizes, features)
+        return features
+    
     def _extract_ip_features(self, packet_data) -> List[float]:
         """Extract IP address-based features"""
         features = []
@@ -194,38 +473,40 @@ class NetworkFeatureExtractor:
         
         return features
     
-    def _extract_single_ip_features(self, ip_str: str) -> List[float]:
+    def _extract_single_ip_features(self, ip_str: str) -> Tuple[float, ...]:
         """Extract features from a single IP address"""
-        features = []
-        
-        try:
-            ip = ipaddress.ip_address(ip_str)
-            
-            # IP type features
-            features.append(1.0 if ip.is_private else 0.0)
-            features.append(1.0 if ip.is_loopback else 0.0)
-            features.append(1.0 if ip.is_multicast else 0.0)
-            features.append(1.0 if ip.is_reserved else 0.0)
-            
-            # IP octets (for IPv4) or normalized segments (for IPv6)
-            if ip.version == 4:
-                octets = [int(x) for x in ip_str.split('.')]
-                features.extend([float(x) / 255.0 for x in octets])
-            else:
-                # For IPv6, use hash-based features
-                ip_hash = int(hashlib.md5(ip_str.encode()).hexdigest()[:8], 16)
-                features.extend([
-                    float((ip_hash >> 24) & 0xFF) / 255.0,
-                    float((ip_hash >> 16) & 0xFF) / 255.0,
-                    float((ip_hash >> 8) & 0xFF) / 255.0,
-                    float(ip_hash & 0xFF) / 255.0
-                ])
-            
-        except ValueError:
-            # Invalid IP address
-            features.extend([0.0] * 8)  # 4 type features + 4 octet features
-        
-        return features
+        return _single_ip_features(ip_str)
+    
+    def _extract_ip_features_batch(self, src_ips, dst_ips) -> np.ndarray:
+        """IP columns for a batch, parsing each distinct address once"""
+        src_ips = np.asarray(src_ips, dtype=str)
+        addresses, inverse = np.unique(np.concatenate([src_ips, np.asarray(dst_ips, dtype=str)]),
+                                       return_inverse=True)
+        src_idx, dst_idx = inverse[:len(src_ips)], inverse[len(src_ips):]
+        
+        # IPv4 addresses are parsed as one uint32 column; IPv6 and invalid ones fall back
+        values, is_ipv4 = _parse_ipv4_column(addresses)
+        table = np.zeros((len(addresses), 8), dtype=np.float64)
+        table[is_ipv4] = np.column_stack(_ipv4_features(values[is_ipv4]))
+        
+        # Version (0 when unparseable) and the value _calculate_ip_distance compares
+        versions = np.where(is_ipv4, 4, 0)
+        values = values.astype(np.int64)
+        for i in np.flatnonzero(~is_ipv4):
+            address = addresses[i]
+            table[i] = self._extract_single_ip_features(address)
+            try:
+                ip = ipaddress.ip_address(address)
+            except ValueError:
+                continue
+            versions[i] = ip.version
+            values[i] = _ipv6_hash(int(ip))
+        
+        src_version, dst_version = versions[src_idx], versions[dst_idx]
+        distance = np.abs(values[src_idx] - values[dst_idx]) / (2**32 - 1)
+        distance = np.where((src_version == dst_version) & (src_version != 0), np.minimum(distance, 1.0), 1.0)
+        
+        return np.column_stack([table[src_idx], table[dst_idx], src_idx == dst_idx, distance])
     
     def _extract_port_features(self, packet_data) -> List[float]:
         """Extract port-based features"""
@@ -245,56 +526,56 @@ class NetworkFeatureExtractor:
         
         return features
     
-    def _analyze_port(self, port: int) -> List[float]:
-        """Analyze port characteristics"""
-        features = []
-        
-        # Port number normalized
-        features.append(float(port) / 65535.0)
-        
-        # Port categories
-        is_well_known = 1.0 if port < 1024 else 0.0
-        is_registered = 1.0 if 1024 <= port < 49152 else 0.0
-        is_dynamic = 1.0 if port >= 49152 else 0.0
-        
-        features.extend([is_well_known, is_registered, is_dynamic])
-        
-        # Service category (simplified)
-        service_category = 0.0
-        for category, ports in self.port_categories.items():
-            if port in ports:
-                service_category = hash(category) % 100 / 100.0
-                break
-        
-        features.append(service_category)
-        
-        return features
+    def _extract_port_features_batch(self, ports) -> np.ndarray:
+        """Port columns for a batch; missing or zero ports give zeros"""
+        ports = np.asarray(ports)
+        if ports.dtype.kind not in 'iu':
+            # Nullable or mixed columns; None, NaN and non-numeric ports become 0
+            import pandas as pd
+            ports = pd.to_numeric(pd.Series(ports), errors='coerce').fillna(0).to_numpy()
+        return self._port_table[ports.astype(np.int64)]
+    
+    def _analyze_port(self, port: int) -> np.ndarray:
+        """Analyze port characteristics: normalized number, range buckets and service category"""
+        return self._port_table[port]
     
     def _extract_protocol_features(self, packet_data) -> List[float]:
         """Extract protocol-based features"""
         features = []
         
         protocol = packet_data.protocol
+        row = self._protocol_rows[self._protocol_ids.get(protocol, -1)]
         
-        # One-hot encoding for common protocols
-        common_protocols = ['TCP', 'UDP', 'ICMP', 'ARP']
-        for proto in common_protocols:
-            features.append(1.0 if protocol == proto else 0.0)
-        
-        # Protocol weight
-        weight = self.protocol_weights.get(protocol, 0.1)
-        features.append(weight)
+        # One-hot encoding for common protocols (TCP, UDP, ICMP, ARP) and protocol weight
+        features.extend(row[:4])
+        features.append(row[-1])
         
         # TCP flags (if applicable)
-        if protocol == 'TCP' and hasattr(packet_data, 'flags'):
-            tcp_flags = ['syn', 'ack', 'fin', 'rst', 'psh', 'urg']
-            for flag in tcp_flags:
-                features.append(1.0 if packet_data.flags.get(flag, False) else 0.0)
+        if protocol == 'TCP' and hasattr(packet_data, 'tcp_flags'):
+            # syn, ack, fin, rst, psh, urg
+            for mask in (0x02, 0x10, 0x01, 0x04, 0x08, 0x20):
+                features.append(1.0 if packet_data.tcp_flags & mask else 0.0)
         else:
             features.extend([0.0] * 6)
         
         return features
     
+    def _extract_protocol_features_batch(self, protocols, tcp_flags=None) -> np.ndarray:
+        """Protocol one-hot, weight and TCP flag columns for a batch"""
+        unique_protocols, inverse = np.unique(np.asarray(protocols, dtype=str), return_inverse=True)
+        ids = np.array([self._protocol_ids.get(p, -1) for p in unique_protocols], dtype=np.intp)[inverse]
+        rows = self._protocol_table[ids]
+        
+        if tcp_flags is None:
+            flags = np.zeros((len(ids), 6), dtype=bool)
+        else:
+            # syn, ack, fin, rst, psh, urg
+            masks = np.array([0x02, 0x10, 0x01, 0x04, 0x08, 0x20])
+            flags = (np.asarray(tcp_flags, dtype=np.int64)[:, None] & masks) != 0
+            flags &= (ids == self._protocol_ids['TCP'])[:, None]
+        
+        return np.column_stack([rows[:, :4], rows[:, -1], flags])
+    
     def _extract_timing_features(self, packet_data) -> List[float]:
         """Extract timing-based features"""
         features = []
@@ -304,44 +585,69 @@ class NetworkFeatureExtractor:
         # Time of day features
         hour = timestamp.hour
         minute = timestamp.minute
+        weekday = timestamp.weekday()
         
         features.extend([
             float(hour) / 24.0,
             float(minute) / 60.0,
-            float(timestamp.weekday()) / 7.0,
+            float(weekday) / 7.0,
         ])
         
         # Time category features
         features.append(1.0 if 9 <= hour <= 17 else 0.0)  # Business hours
         features.append(1.0 if hour < 6 or hour > 22 else 0.0)  # Night time
-        features.append(1.0 if timestamp.weekday() >= 5 else 0.0)  # Weekend
+        features.append(1.0 if weekday >= 5 else 0.0)  # Weekend
         
         return features
     
+    def _extract_timing_features_batch(self, timestamps) -> np.ndarray:
+        """Time-of-day and calendar columns for a batch, computed from epoch nanoseconds"""
+        ns = np.asarray(timestamps)
+        if ns.dtype.kind not in 'iuM':
+            # datetime objects; aware ones use their wall-clock time like the scalar path
+            import pandas as pd
+            index = pd.DatetimeIndex(ns)
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            ns = index.to_numpy()
+        if ns.dtype.kind == 'M':
+            ns = ns.astype('datetime64[ns]').view(np.int64)
+        
+        features = np.empty((len(ns), 6), dtype=np.float64)
+        _timing_features(ns.astype(np.int64), features)
+        return features
+    
     def _extract_payload_features(self, packet_data) -> List[float]:
         """Extract payload-based features"""
+        return self._analyze_payload(packet_data.payload_preview)
+    
+    def _extract_payload_features_batch(self, payloads, count: int) -> np.ndarray:
+        """Payload columns for a batch; rows without a payload stay zero"""
+        features = np.zeros((count, 5), dtype=np.float64)
+        if payloads is not None:
+            for i, payload in enumerate(payloads):
+                if payload:
+                    features[i] = self._analyze_payload(payload)
+        return features
+    
+    def _analyze_payload(self, payload: str) -> List[float]:
+        """Entropy, hex ratio and pattern counts of a payload preview"""
         features = []
         
-        payload = packet_data.payload_preview
-        
         if payload:
             # Payload entropy
             entropy = self._calculate_entropy(payload)
             features.append(entropy)
             
-            # Character distribution features
-            hex_chars = len([c for c in payload if c in '0123456789abcdefABCDEF'])
+            # Character distribution features; characters beyond latin-1 become '?'
+            buf = np.frombuffer(payload.encode('latin-1', 'replace'), dtype=np.uint8)
+            lower = buf | 0x20
+            hex_chars = np.count_nonzero(((buf >= 0x30) & (buf <= 0x39)) | ((lower >= 0x61) & (lower <= 0x66)))
             features.append(float(hex_chars) / max(len(payload), 1))
             
             # Common patterns
-            patterns = [
-                r'[0-9a-fA-F]{32}',  # MD5-like hashes
-                r'[0-9a-fA-F]{40}',  # SHA1-like hashes
-                r'(?:[A-Za-z0-9+/]{4})*(?:[A-Za-z0-9+/]{2}==|[A-Za-z0-9+/]{3}=)?',  # Base64
-            ]
-            
-            for pattern in patterns:
-                matches = len(re.findall(pattern, payload))
+            for pattern in _PAYLOAD_PATTERNS:
+                matches = len(pattern.findall(payload))
                 features.append(float(matches))
             
         else:
@@ -351,17 +657,15 @@ class NetworkFeatureExtractor:
     
     def _get_protocol_features(self, protocol: str) -> List[float]:
         """Get protocol-specific features"""
-        features = []
-        
-        # Protocol encoding
-        protocols = ['TCP', 'UDP', 'ICMP', 'ARP', 'IGMP']
-        for proto in protocols:
-            features.append(1.0 if protocol == proto else 0.0)
-        
-        return features
+        # Protocol encoding (TCP, UDP, ICMP, ARP, IGMP)
+        return self._protocol_rows[self._protocol_ids.get(protocol, -1)][:5]
     
     def _calculate_ip_distance(self, ip1: str, ip2: str) -> float:
         """Calculate normalized distance between IP addresses"""
+        int1, int2 = _parse_ipv4(ip1), _parse_ipv4(ip2)
+        if int1 is not None and int2 is not None:
+            return abs(int1 - int2) / (2**32 - 1)
+        
         try:
             addr1 = ipaddress.ip_address(ip1)
             addr2 = ipaddress.ip_address(ip2)
@@ -377,8 +681,8 @@ class NetworkFeatureExtractor:
                 distance = abs(int1 - int2) / max_distance
             else:
                 # For IPv6, use a simplified hash-based distance
-                hash1 = int(hashlib.md5(ip1.encode()).hexdigest()[:8], 16)
-                hash2 = int(hashlib.md5(ip2.encode()).hexdigest()[:8], 16)
+                hash1 = _ipv6_hash(int(addr1))
+                hash2 = _ipv6_hash(int(addr2))
                 distance = abs(hash1 - hash2) / (2**32 - 1)
             
             return min(distance, 1.0)
@@ -391,18 +695,12 @@ class NetworkFeatureExtractor:
         if not data:
             return 0.0
         
-        # Count character frequencies
-        char_counts = defaultdict(int)
-        for char in data:
-            char_counts[char] += 1
-        
-        # Calculate entropy
-        entropy = 0.0
-        length = len(data)
-        
-        for count in char_counts.values():
-            probability = count / length
-            if probability > 0:
-                entropy -= probability * np.log2(probability)
-        
-        return entropy
+        try:
+            buf = np.frombuffer(data.encode('latin-1'), dtype=np.uint8)
+        except UnicodeEncodeError:
+            # Characters beyond latin-1 are counted by code point instead
+            code_points = np.frombuffer(data.encode('utf-32-le'), dtype=np.uint32)
+            _, counts = np.unique(code_points, return_counts=True)
+            return float(_entropy_from_counts(counts, len(data)))
+        
+        return float(_entropy_u8(buf))
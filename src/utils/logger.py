@@ -6,11 +6,27 @@ Provides structured logging with different output formats
 import logging
 import logging.handlers
 import sys
-import json
 from datetime import datetime
 from pathlib import Path
 import structlog
 
+try:
+    import orjson
+    
+    def _json_dumps(value, default=None, **kwargs) -> str:
+        return orjson.dumps(value, default=default).decode()
+except ImportError:
+    # Fallback for environments without orjson
+    import json
+    _json_dumps = json.dumps
+
+# LogRecord attributes that are not user-supplied extra fields
+_STANDARD_ATTRS = frozenset({
+    'name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 'filename', 'module',
+    'exc_info', 'exc_text', 'stack_info', 'lineno', 'funcName', 'created', 'msecs',
+    'relativeCreated', 'thread', 'threadName', 'processName', 'process'
+})
+
 def setup_logging(config: dict = None):
     """Setup structured logging for ShadowWall AI"""
     if config is None:
@@ -26,19 +42,27 @@ def setup_logging(config: dict = None):
     log_file = Path(config['file'])
     log_file.parent.mkdir(parents=True, exist_ok=True)
     
-    # Configure structlog
+    level = getattr(logging, config['level'].upper())
+    
+    # Stack rendering is a debugging aid; exception formatting stays since it is free without exc_info
+    processors = [
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+    if level <= logging.DEBUG:
+        processors.append(structlog.processors.StackInfoRenderer())
+    processors += [
+        structlog.processors.format_exc_info,
+        structlog.processors.UnicodeDecoder(),
+        structlog.processors.JSONRenderer(serializer=_json_dumps) if config['format'] == 'json' else structlog.dev.ConsoleRenderer()
+    ]
+    
+    # Configure structlog; calls below the level return before any processor runs
     structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer() if config['format'] == 'json' else structlog.dev.ConsoleRenderer()
-        ],
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
@@ -46,7 +70,7 @@ def setup_logging(config: dict = None):
     
     # Setup standard logging
     logger = logging.getLogger()
-    logger.setLevel(getattr(logging, config['level'].upper()))
+    logger.setLevel(level)
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
@@ -111,15 +135,9 @@ class JSONFormatter(logging.Formatter):
             log_entry['exception'] = self.formatException(record.exc_info)
         
         # Add extra fields
-        for key, value in record.__dict__.items():
-            if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 
-                          'pathname', 'filename', 'module', 'exc_info', 
-                          'exc_text', 'stack_info', 'lineno', 'funcName', 
-                          'created', 'msecs', 'relativeCreated', 'thread', 
-                          'threadName', 'processName', 'process']:
-                log_entry[key] = value
+        log_entry.update({key: value for key, value in record.__dict__.items() if key not in _STANDARD_ATTRS})
         
-        return json.dumps(log_entry)
+        return _json_dumps(log_entry)
 
 def get_logger(name: str):
     """Get a structured logger instance"""
@@ -1,28 +1,35 @@
 # ShadowWall AI Testing Framework
 
-import unittest
 import asyncio
-from unittest.mock import Mock, patch, AsyncMock
+import unittest
+from unittest.mock import Mock, patch, AsyncMock, create_autospec
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import importlib.util
+import glob
+import io
+import sys
 import tempfile
+import types
 import os
+import shutil
 from datetime import datetime
 
-# Test imports
-from src.core.config.settings import load_config
-from src.core.ml.threat_detector import ThreatDetector
-from src.core.ml.behavioral_analyzer import BehavioralAnalyzer
-from src.core.honeypots.manager import HoneypotManager
-from src.core.network.monitor import NetworkMonitor
-from src.core.deception.controller import DeceptionController
-from src.core.intelligence.threat_intel import ThreatIntelligence
-from src.core.sandbox.emulator import SandboxEmulator
+import numpy as np
+
+# Fixed timestamp so test inputs and component clocks are reproducible across runs
+FIXED_TS = datetime(2024, 1, 1, 12, 0, 0)
+
+# Components are imported by the test classes that use them, so running a
+# single class only loads the stacks (scapy, sklearn, docker) it exercises
 
 
 class TestConfiguration(unittest.TestCase):
     """Test configuration loading and validation"""
     
-    def setUp(self):
-        self.test_config = {
+    @classmethod
+    def setUpClass(cls):
+        cls.test_config = {
             'database': {'url': 'sqlite:///test.db'},
             'logging': {'level': 'INFO'},
             'network': {'interface': 'eth0'},
@@ -32,238 +39,354 @@ class TestConfiguration(unittest.TestCase):
             'sandbox': {'enabled': False}
         }
     
-    def test_config_loading(self):
-        """Test configuration loading from dict"""
-        # This would normally test file loading, but we'll test the structure
-        self.assertIn('database', self.test_config)
-        self.assertIn('logging', self.test_config)
-        self.assertIn('network', self.test_config)
-        self.assertIn('ml', self.test_config)
-    
     def test_config_validation(self):
         """Test configuration validation"""
         # Test required fields are present
-        required_sections = ['database', 'logging', 'network', 'ml']
-        for section in required_sections:
-            self.assertIn(section, self.test_config)
+        for section in ('database', 'logging', 'network', 'ml', 'honeypots', 'dashboard', 'sandbox'):
+            with self.subTest(section=section):
+                self.assertIn(section, self.test_config)
+
+
+# Trained-model directories keyed by detector config, shared by every detector built with it
+_CACHED_MODELS = {}
+
+def _cached_models_dir(config):
+    """Models directory for a detector config, so models are trained once and loaded afterwards"""
+    import hashlib
+    from src.core.ml import threat_detector
+    
+    key = repr(sorted(config.items()))
+    if key not in _CACHED_MODELS:
+        prefix = f'shadowwall-test-models-{hashlib.sha1(key.encode()).hexdigest()[:12]}-'
+        # Models saved by an older detector must not be reloaded
+        with open(threat_detector.__file__, 'rb') as f:
+            path = os.path.join(tempfile.gettempdir(), prefix + hashlib.sha1(f.read()).hexdigest()[:12])
+        
+        # Keep one directory per config by dropping those left by older detector sources
+        for stale in glob.glob(os.path.join(tempfile.gettempdir(), prefix + '*')):
+            if stale != path:
+                shutil.rmtree(stale, ignore_errors=True)
+        
+        os.makedirs(path, exist_ok=True)
+        _CACHED_MODELS[key] = path
+    return _CACHED_MODELS[key]
 
 
-class TestThreatDetector(unittest.TestCase):
+class TestThreatDetector(unittest.IsolatedAsyncioTestCase):
     """Test ML threat detection"""
     
-    def setUp(self):
-        self.config = {
-            'models_dir': tempfile.mkdtemp(),
+    @classmethod
+    def setUpClass(cls):
+        from src.core.ml.threat_detector import ThreatDetector
+        
+        cls.config = {
             'update_interval': 3600,
             'anomaly_threshold': 0.95,
+            'confidence_threshold': 0.7,
             'ensemble_weights': [0.4, 0.3, 0.3]
         }
-        self.detector = ThreatDetector(self.config)
+        cls.config['models_dir'] = _cached_models_dir(cls.config)
+        cls.detector = ThreatDetector(cls.config['models_dir'], cls.config)
+        
+        # Trained on the first run and loaded from the models cache afterwards; forests
+        # are served from packed arrays to keep that first run short
+        cls.detector._compile_forest = lambda forest, libpath: None
+        asyncio.run(cls.detector._load_or_create_models())
     
     def test_initialization(self):
         """Test threat detector initialization"""
         self.assertIsNotNone(self.detector)
         self.assertEqual(self.detector.config, self.config)
     
-    @patch('src.core.ml.threat_detector.IsolationForest')
-    @patch('src.core.ml.threat_detector.RandomForestClassifier')
-    def test_model_training(self, mock_rf, mock_iso):
+    async def test_model_training(self):
         """Test model training with synthetic data"""
-        # Mock the models
-        mock_iso_instance = Mock()
-        mock_rf_instance = Mock()
-        mock_iso.return_value = mock_iso_instance
-        mock_rf.return_value = mock_rf_instance
-        
-        # Test training
-        asyncio.run(self.detector._train_models())
+        from src.core.ml.threat_detector import MODEL_FILES, CompiledForest, PackedForest, ThreatDetector
         
-        # Verify models were created and trained
-        mock_iso.assert_called_once()
-        mock_rf.assert_called_once()
+        with tempfile.TemporaryDirectory() as models_dir:
+            detector = ThreatDetector(models_dir, self.config)
+            # Serve the packed arrays rather than spending most of the test building a native forest
+            detector._compile_forest = lambda forest, libpath: None
+            
+            await detector._create_model('threat_classifier')
+            
+            # Verify the forest was trained, packed and saved with its scaler
+            model = detector.models['threat_classifier']
+            self.assertIsInstance(model, (PackedForest, CompiledForest))
+            self.assertIn('port_scan', model.classes_)
+            self.assertTrue(os.path.exists(os.path.join(models_dir, MODEL_FILES['threat_classifier'])))
+            self.assertTrue(os.path.exists(os.path.join(models_dir, 'threat_classifier_scaler.pkl')))
+            
+            # The saved archive reloads to the same predictions
+            reloaded = PackedForest.load(os.path.join(models_dir, MODEL_FILES['threat_classifier']))
+            rows = np.random.default_rng(0).standard_normal((16, 32), dtype=np.float32)
+            np.testing.assert_array_equal(reloaded.predict(rows), model.predict(rows))
     
-    def test_threat_analysis(self):
+    async def test_threat_analysis(self):
         """Test threat analysis logic"""
-        # Test with sample features
-        features = [0.5, 0.3, 0.8, 0.2, 0.9]
+        # A port-scan-like row: high connection rates, everything else at baseline
+        features = np.zeros(32, dtype=np.float32)
+        features[:5] = 3.0
         
-        # Mock trained models
-        self.detector.isolation_forest = Mock()
-        self.detector.random_forest = Mock()
-        self.detector.isolation_forest.decision_function.return_value = [-0.1]
-        self.detector.random_forest.predict_proba.return_value = [[0.8, 0.2]]
+        anomaly_score = await self.detector._detect_anomaly(features)
+        threat = await self.detector._classify_threat(features)
         
-        result = self.detector.analyze_threat(features)
+        self.assertIsInstance(float(anomaly_score), float)
+        self.assertIsNotNone(threat)
+        self.assertEqual(threat.threat_type, 'port_scan')
+        self.assertGreater(threat.confidence, self.config['confidence_threshold'])
+    
+    def test_anomaly_calibration(self):
+        """Test that no training row crosses the -0.5 anomaly trigger"""
+        features, _ = self.detector._generate_synthetic_training_data('anomaly_detector')
+        scaled = self.detector.scalers['anomaly_detector'].transform(features)
+        scores = self.detector.models['anomaly_detector'].decision_function(scaled)
         
-        self.assertIsInstance(result, dict)
-        self.assertIn('threat_score', result)
-        self.assertIn('threat_type', result)
+        self.assertFalse(np.any(scores < -0.5))
+        self.assertAlmostEqual(float(np.mean(scores < 0)), 0.1, places=2)
 
 
-class TestBehavioralAnalyzer(unittest.TestCase):
+class TestBehavioralAnalyzer(unittest.IsolatedAsyncioTestCase):
     """Test behavioral analysis"""
     
     def setUp(self):
+        from src.core.ml.behavioral_analyzer import BehavioralAnalyzer
+        
         self.config = {
             'learning_rate': 0.1,
             'baseline_period': 3600,
+            'window_size': 100,
             'anomaly_threshold': 2.0
         }
-        self.analyzer = BehavioralAnalyzer(self.config)
+        self.analyzer = BehavioralAnalyzer(self.config, clock=lambda: FIXED_TS)
     
     def test_initialization(self):
         """Test behavioral analyzer initialization"""
         self.assertIsNotNone(self.analyzer)
         self.assertEqual(len(self.analyzer.entity_profiles), 0)
     
-    def test_entity_tracking(self):
+    async def test_entity_tracking(self):
         """Test entity behavior tracking"""
-        entity_id = "user_123"
-        behavior_data = {
-            'login_time': datetime.now(),
-            'source_ip': '192.168.1.100',
-            'actions': ['login', 'file_access']
-        }
+        entity_id = '192.168.1.100'
+        packet = types.SimpleNamespace(
+            src_ip=entity_id, dst_ip='10.0.0.5', src_port=51515, dst_port=22,
+            protocol='tcp', size=60
+        )
         
-        result = asyncio.run(self.analyzer.track_behavior(entity_id, behavior_data))
+        await self.analyzer.process_packet(packet)
         
-        self.assertIsInstance(result, dict)
-        self.assertIn('anomaly_score', result)
         self.assertIn(entity_id, self.analyzer.entity_profiles)
+        profile = self.analyzer.entity_profiles[entity_id]
+        self.assertEqual(profile.entity_type, 'ip')
+        
+        # Profile times come from the injected clock
+        self.assertEqual(profile.first_seen, FIXED_TS)
+        self.assertEqual(profile.last_seen, FIXED_TS)
+        
+        # Profiles are slotted to keep per-entity memory down
+        self.assertFalse(hasattr(profile, '__dict__'))
 
 
-class TestHoneypotManager(unittest.TestCase):
+class TestHoneypotManager(unittest.IsolatedAsyncioTestCase):
     """Test honeypot management"""
     
     def setUp(self):
+        from src.core.honeypots.manager import HoneypotManager
+        
         self.config = {
             'ssh_port': 2222,
             'http_port': 8080,
             'ftp_port': 2121,
             'deployment_strategy': 'adaptive',
-            'max_honeypots': 10
+            'max_instances': 10
         }
-        self.manager = HoneypotManager(self.config)
+        self.manager = HoneypotManager(self.config, clock=lambda: FIXED_TS)
     
     def test_initialization(self):
         """Test honeypot manager initialization"""
         self.assertIsNotNone(self.manager)
-        self.assertEqual(len(self.manager.active_honeypots), 0)
+        self.assertEqual(len(self.manager.honeypots), 0)
     
     @patch('asyncio.start_server')
     async def test_honeypot_deployment(self, mock_server):
         """Test honeypot deployment"""
         mock_server.return_value = Mock()
         
-        honeypot_id = await self.manager.deploy_honeypot('ssh', '0.0.0.0', 2222)
+        honeypot_id = await self.manager.deploy_honeypot('ssh')
         
         self.assertIsNotNone(honeypot_id)
-        self.assertIn(honeypot_id, self.manager.active_honeypots)
+        self.assertIn(honeypot_id, self.manager.honeypots)
+        self.assertEqual(self.manager.honeypots[honeypot_id].created_at, FIXED_TS)
+        mock_server.assert_called_once()
     
-    def test_interaction_recording(self):
+    async def test_interaction_recording(self):
         """Test interaction recording"""
         interaction_data = {
             'source_ip': '192.168.1.100',
             'honeypot_type': 'ssh',
-            'timestamp': datetime.now(),
+            'timestamp': FIXED_TS,
             'data': 'login attempt'
         }
         
-        asyncio.run(self.manager.record_interaction(interaction_data))
+        callback = AsyncMock()
+        self.manager.on_interaction(callback)
+        
+        await self.manager.record_interactions([dict(interaction_data) for _ in range(1000)])
         
-        # Verify interaction was recorded
-        self.assertTrue(len(self.manager.interactions) > 0)
+        # Verify the whole batch was recorded and delivered
+        self.assertEqual(len(self.manager.interactions), 1000)
+        self.assertEqual(callback.await_count, 1000)
 
 
-class TestNetworkMonitor(unittest.TestCase):
+class TestNetworkMonitor(unittest.IsolatedAsyncioTestCase):
     """Test network monitoring"""
     
-    def setUp(self):
-        self.config = {
-            'interface': 'lo',  # Use loopback for testing
-            'capture_filter': 'tcp',
-            'simulation_mode': True  # Use simulation for testing
+    @classmethod
+    def setUpClass(cls):
+        # Stand-in for scapy.all so nothing under test pays for loading scapy
+        cls.fake_scapy = types.SimpleNamespace(AsyncSniffer=Mock())
+        scapy_patch = patch.dict(sys.modules, {'scapy.all': cls.fake_scapy})
+        scapy_patch.start()
+        cls.addClassCleanup(scapy_patch.stop)
+        
+        from src.core.network.monitor import NetworkMonitor
+        
+        cls.interfaces = ['lo']  # Use loopback for testing
+        cls.config = {
+            'capture': {'backend': 'scapy'}  # Capture through the faked sniffer
         }
-        self.monitor = NetworkMonitor(self.config)
+        cls.monitor = NetworkMonitor(cls.interfaces, cls.config)
     
     def test_initialization(self):
         """Test network monitor initialization"""
         self.assertIsNotNone(self.monitor)
-        self.assertEqual(self.monitor.interface, 'lo')
+        self.assertEqual(self.monitor.interfaces, ['lo'])
     
-    @patch('scapy.all.AsyncSniffer')
-    def test_packet_capture_start(self, mock_sniffer):
+    async def test_packet_capture_start(self):
         """Test packet capture start"""
+        mock_sniffer = self.fake_scapy.AsyncSniffer
+        mock_sniffer.reset_mock()
         mock_sniffer_instance = Mock()
         mock_sniffer.return_value = mock_sniffer_instance
         
-        asyncio.run(self.monitor.start())
+        await self.monitor.start()
+        self.addAsyncCleanup(self.monitor.stop)
         
-        if not self.config['simulation_mode']:
-            mock_sniffer.assert_called_once()
+        mock_sniffer.assert_called_once()
+        self.assertEqual(mock_sniffer.call_args.kwargs['iface'], 'lo')
+        mock_sniffer_instance.start.assert_called_once()
+        
+        # The real scapy package must never be imported by the monitor
+        self.assertNotIn('scapy', sys.modules)
 
 
-class TestDeceptionController(unittest.TestCase):
+class TestDeceptionController(unittest.IsolatedAsyncioTestCase):
     """Test deception strategies"""
     
-    def setUp(self):
-        self.config = {
+    @classmethod
+    def setUpClass(cls):
+        from src.core.deception.controller import DeceptionController
+        from src.core.honeypots.manager import HoneypotManager
+        
+        cls.config = {
             'strategy_update_interval': 300,
             'effectiveness_threshold': 0.7
         }
-        # Mock dependencies
-        self.honeypot_manager = Mock()
-        self.threat_detector = Mock()
-        self.controller = DeceptionController(self.config, self.honeypot_manager, self.threat_detector)
+        # Mock dependencies, specced once per class against the real interfaces
+        cls.honeypot_manager = create_autospec(HoneypotManager, instance=True)
+        cls.controller = DeceptionController(cls.honeypot_manager, cls.config)
+    
+    def setUp(self):
+        # Start each test from clean call records without rebuilding the spec
+        self.honeypot_manager.reset_mock()
     
     def test_initialization(self):
         """Test deception controller initialization"""
         self.assertIsNotNone(self.controller)
-        self.assertTrue(len(self.controller.available_strategies) > 0)
+        self.assertTrue(len(self.controller.strategies) > 0)
     
     def test_strategy_selection(self):
         """Test strategy selection logic"""
         threat_context = {
-            'threat_type': 'reconnaissance',
+            'type': 'reconnaissance',
             'source_ip': '192.168.1.100',
             'confidence': 0.8
         }
         
-        strategy = asyncio.run(self.controller.select_strategy(threat_context))
+        strategies = self.controller._select_strategies(threat_context['type'], threat_context)
+        
+        self.assertTrue(len(strategies) > 0)
+        self.assertIn('reconnaissance', strategies[0].target_threats)
+        self.assertTrue(strategies[0].name)
+        self.assertIn('type', strategies[0].implementation)
+    
+    async def test_honeypot_strategy_deployment(self):
+        """Test that a honeypot strategy deploys through the honeypot manager"""
+        self.honeypot_manager.get_honeypot_status.return_value = {'honeypots': {}}
+        self.honeypot_manager.deploy_honeypot.return_value = 'ssh_2222_1704110400'
+        
+        deployed = await self.controller._deploy_strategy(
+            self.controller.strategies['adaptive_honeypot'],
+            {'type': 'port_scan', 'source_ip': '192.168.1.100'}
+        )
         
-        self.assertIsNotNone(strategy)
-        self.assertIn('name', strategy)
-        self.assertIn('actions', strategy)
+        self.assertTrue(deployed)
+        self.assertEqual(self.honeypot_manager.deploy_honeypot.await_count, 3)
 
 
-class TestSandboxEmulator(unittest.TestCase):
+class TestSandboxEmulator(unittest.IsolatedAsyncioTestCase):
     """Test sandbox emulation"""
     
-    def setUp(self):
-        self.config = {
+    @classmethod
+    def setUpClass(cls):
+        from src.core.sandbox.emulator import SandboxEmulator
+        
+        cls.config = {
             'enabled': True,
             'max_concurrent_sessions': 5
         }
-        self.emulator = SandboxEmulator(self.config)
+        cls.emulator = SandboxEmulator(cls.config)
     
     def test_initialization(self):
         """Test sandbox emulator initialization"""
         self.assertIsNotNone(self.emulator)
         self.assertTrue(len(self.emulator.environments) > 0)
     
+    @unittest.skipUnless(importlib.util.find_spec('docker'), 'docker not installed')
     @patch('docker.from_env')
-    def test_session_creation(self, mock_docker):
+    async def test_session_creation(self, mock_docker):
         """Test sandbox session creation"""
         # Mock Docker client
         mock_docker.return_value = Mock()
         
-        session_id = asyncio.run(
-            self.emulator.create_session('test_user', 'basic_network', 60)
-        )
+        session_id = await self.emulator.create_session('test_user', 'basic_network', 60)
+        if session_id:
+            self.addAsyncCleanup(self.emulator.destroy_session, session_id)
         
         # In simulation mode, this should still work
         self.assertTrue(session_id is None or isinstance(session_id, str))
     
+    async def test_concurrent_sessions_same_user(self):
+        """Test that sessions created together by one user stay distinct"""
+        # The emulator is shared across tests, so compare against its counts beforehand
+        active_before = self.emulator.get_statistics()['active_sessions']
+        
+        first, second = await asyncio.gather(
+            self.emulator.create_session('burst_user', 'basic_network', 60),
+            self.emulator.create_session('burst_user', 'basic_network', 60)
+        )
+        
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertNotEqual(first, second)
+        self.addAsyncCleanup(self.emulator.destroy_session, second)
+        
+        await self.emulator.destroy_session(first)
+        
+        # One session left and counted once
+        stats = self.emulator.get_statistics()
+        self.assertEqual(len(await self.emulator.list_sessions('burst_user')), 1)
+        self.assertEqual(stats['active_sessions'], active_before + 1)
+    
     def test_environment_listing(self):
         """Test available environments listing"""
         environments = self.emulator.get_available_environments()
@@ -273,30 +396,68 @@ class TestSandboxEmulator(unittest.TestCase):
         self.assertIn('corporate_sim', environments)
 
 
+def _create_test_engine(url):
+    """One engine over a single connection so every component sees the same in-memory database"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    
+    return create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
 class TestIntegration(unittest.TestCase):
     """Integration tests"""
     
-    def setUp(self):
-        self.config = {
-            'database': {'url': 'sqlite:///:memory:'},
+    @classmethod
+    def setUpClass(cls):
+        cls.config = {
+            'database': {'url': 'sqlite:///file::memory:?cache=shared&uri=true'},
             'logging': {'level': 'INFO'},
-            'network': {'interface': 'lo', 'simulation_mode': True},
-            'ml': {'model_update_interval': 3600},
-            'honeypots': {'enabled': True, 'ssh_port': 2222},
+            'network': {'interfaces': ['lo'], 'capture': {'backend': 'scapy'}},
+            'ml': {'model_update_interval': 3600, 'window_size': 100, 'anomaly_threshold': 2.0},
+            'honeypots': {'enabled': True, 'ssh_port': 2222, 'max_instances': 10},
             'dashboard': {'port': 8080},
             'sandbox': {'enabled': False},
             'deception': {'strategy_update_interval': 300},
             'threat_intel': {'enabled': True, 'update_interval': 3600}
         }
+        
+        # Shared by all components under test instead of one private database per engine
+        cls.engine = _create_test_engine(cls.config['database']['url'])
+        cls.addClassCleanup(cls.engine.dispose)
+    
+    def test_shared_database(self):
+        """Test that the database manager's schema is visible through the shared engine"""
+        from sqlalchemy import inspect
+        from src.database.connection import DatabaseManager
+        
+        db_manager = DatabaseManager(self.config['database']['url'], prewarm=False)
+        
+        async def create_schema():
+            await db_manager.initialize()
+            try:
+                return inspect(self.engine).get_table_names()
+            finally:
+                await db_manager.close()
+        
+        tables = asyncio.run(create_schema())
+        
+        self.assertIn('protocols', tables)
+        self.assertIn('connection_events', tables)
     
     def test_component_initialization(self):
         """Test that all components can be initialized together"""
+        from src.core.ml.threat_detector import ThreatDetector
+        from src.core.ml.behavioral_analyzer import BehavioralAnalyzer
+        from src.core.honeypots.manager import HoneypotManager
+        from src.core.network.monitor import NetworkMonitor
+        
         try:
             # Initialize core components
-            threat_detector = ThreatDetector(self.config['ml'])
+            with tempfile.TemporaryDirectory() as models_dir:
+                threat_detector = ThreatDetector(models_dir, self.config['ml'])
             behavioral_analyzer = BehavioralAnalyzer(self.config['ml'])
             honeypot_manager = HoneypotManager(self.config['honeypots'])
-            network_monitor = NetworkMonitor(self.config['network'])
+            network_monitor = NetworkMonitor(self.config['network']['interfaces'], self.config['network'])
             
             # Verify initialization
             self.assertIsNotNone(threat_detector)
@@ -308,52 +469,93 @@ class TestIntegration(unittest.TestCase):
             self.fail(f"Component initialization failed: {e}")
 
 
+TEST_CLASSES = [
+    TestConfiguration,
+    TestThreatDetector,
+    TestBehavioralAnalyzer,
+    TestHoneypotManager,
+    TestNetworkMonitor,
+    TestDeceptionController,
+    TestSandboxEmulator,
+    TestIntegration
+]
+
+
+@functools.lru_cache(maxsize=None)
+def _test_names(class_name):
+    """Test method names of a test class, collected once per process"""
+    return tuple(unittest.TestLoader().getTestCaseNames(globals()[class_name]))
+
+
+def _build_suite(class_name):
+    """Suite for one test class; only the names are reused since a suite drops its tests as they run"""
+    test_class = globals()[class_name]
+    return unittest.TestSuite(test_class(name) for name in _test_names(class_name))
+
+
+def _run_test_class(class_name):
+    """Run one test class in a worker process and return a picklable summary"""
+    stream = io.StringIO()
+    # Test output is captured per test and tracebacks skip formatting locals
+    runner = unittest.TextTestRunner(stream=stream, verbosity=2, buffer=True, tb_locals=False)
+    result = runner.run(_build_suite(class_name))
+    
+    return (
+        stream.getvalue(),
+        result.testsRun,
+        [(str(test), traceback) for test, traceback in result.failures],
+        [(str(test), traceback) for test, traceback in result.errors]
+    )
+
+
 def run_tests():
-    """Run all tests"""
+    """Run all tests, sharded across CPU cores"""
     print("=" * 60)
     print("ShadowWall AI - Running Test Suite")
     print("=" * 60)
     
-    # Create test suite
-    test_suite = unittest.TestSuite()
-    
-    # Add test cases
-    test_classes = [
-        TestConfiguration,
-        TestThreatDetector,
-        TestBehavioralAnalyzer,
-        TestHoneypotManager,
-        TestNetworkMonitor,
-        TestDeceptionController,
-        TestSandboxEmulator,
-        TestIntegration
-    ]
-    
-    for test_class in test_classes:
-        tests = unittest.TestLoader().loadTestsFromTestCase(test_class)
-        test_suite.addTests(tests)
-    
-    # Run tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(test_suite)
+    # Prefer pytest-xdist when available; it load-balances individual tests
+    try:
+        import pytest
+    except ImportError:
+        pytest = None
+    
+    if pytest is not None and importlib.util.find_spec('xdist') is not None:
+        success = pytest.main(["-n", str(os.cpu_count() or 1), "-q", __file__]) == 0
+        print(f"\nResult: {'PASSED' if success else 'FAILED'}")
+        print("=" * 60)
+        return success
+    
+    # Otherwise run each test class in its own process
+    tests_run = 0
+    failures = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=min(len(TEST_CLASSES), os.cpu_count() or 1)) as executor:
+        for output, class_tests_run, class_failures, class_errors in executor.map(
+            _run_test_class, [test_class.__name__ for test_class in TEST_CLASSES]
+        ):
+            sys.stderr.write(output)
+            tests_run += class_tests_run
+            failures.extend(class_failures)
+            errors.extend(class_errors)
     
     # Print summary
     print("\n" + "=" * 60)
-    print(f"Tests run: {result.testsRun}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
+    print(f"Tests run: {tests_run}")
+    print(f"Failures: {len(failures)}")
+    print(f"Errors: {len(errors)}")
     
-    if result.failures:
+    if failures:
         print("\nFailures:")
-        for test, traceback in result.failures:
+        for test, traceback in failures:
             print(f"  - {test}: {traceback}")
     
-    if result.errors:
+    if errors:
         print("\nErrors:")
-        for test, traceback in result.errors:
+        for test, traceback in errors:
             print(f"  - {test}: {traceback}")
     
-    success = len(result.failures) == 0 and len(result.errors) == 0
+    success = len(failures) == 0 and len(errors) == 0
     print(f"\nResult: {'PASSED' if success else 'FAILED'}")
     print("=" * 60)
     